@@ -0,0 +1,128 @@
+# async_runtime.py
+# An alternative to the plain main loop: input polling, the game state machine, display flushing,
+# audio and LEDs run as separate cooperative tasks. Works with uasyncio on the Pico and with
+# CPython's asyncio on a PC (together with the stand-ins from the Simulator folder).
+
+try:
+    import uasyncio as asyncio
+except ImportError:
+    import asyncio
+import utime
+import config
+
+
+class TaskStats:
+    # Measures how late a periodic task wakes up compared to its schedule and how long it runs.
+
+    def __init__(self, name, period_ms):
+        self.name = name
+        self.period_ms = period_ms
+        self.runs = 0
+        self.total_late_us = 0
+        self.max_late_us = 0
+        self.max_run_us = 0
+
+    def record(self, late_us, run_us):
+        self.runs += 1
+        if late_us > 0:
+            self.total_late_us += late_us
+            if late_us > self.max_late_us:
+                self.max_late_us = late_us
+        if run_us > self.max_run_us:
+            self.max_run_us = run_us
+
+    def report(self):
+        avg = self.total_late_us // self.runs if self.runs else 0
+        return f"{self.name}: runs={self.runs} late avg={avg}us max={self.max_late_us}us run max={self.max_run_us}us"
+
+
+async def _periodic(stats, work):
+    # Calls work() every stats.period_ms, keeping to a fixed schedule instead of
+    # sleeping a fixed time after each run.
+    period_us = stats.period_ms * 1000
+    expected = utime.ticks_us()
+    while True:
+        start = utime.ticks_us()
+        work()
+        end = utime.ticks_us()
+        stats.record(utime.ticks_diff(start, expected), utime.ticks_diff(end, start))
+        expected = utime.ticks_add(expected, period_us)
+        delay_us = utime.ticks_diff(expected, utime.ticks_us())
+        if delay_us < 0:
+            # We fell behind by more than a period, restart the schedule from now.
+            expected = utime.ticks_us()
+            delay_us = 0
+        await asyncio.sleep(delay_us / 1000000)
+
+
+class AsyncRuntime:
+    # Wires the game modules into cooperative tasks.
+
+    def __init__(self, game_tick, poll_input, display, audio, leds):
+        # poll_input() returns the name of a pressed button or None.
+        self.game_tick = game_tick
+        self.poll_input = poll_input
+        self.display = display
+        self.audio = audio
+        self.leds = leds
+        # Presses collected by the input task and not yet handled by the game task.
+        self.pending_presses = []
+        self.dropped_presses = 0
+        self.stats = [
+            TaskStats("input", config.ASYNC_INPUT_PERIOD_MS),
+            TaskStats("game", config.ASYNC_GAME_PERIOD_MS),
+            TaskStats("display", config.ASYNC_DISPLAY_PERIOD_MS),
+            TaskStats("audio", config.ASYNC_AUDIO_PERIOD_MS),
+            TaskStats("leds", config.ASYNC_LED_PERIOD_MS),
+        ]
+        # Screens are rendered by the game task and pushed to the panel by the display task.
+        display.deferred = True
+
+    def _poll_input(self):
+        pressed = self.poll_input()
+        if pressed:
+            if len(self.pending_presses) < config.ASYNC_INPUT_QUEUE_LENGTH:
+                self.pending_presses.append(pressed)
+            else:
+                self.dropped_presses += 1
+
+    def _step_game(self):
+        # One press per step, so every press gets its own state machine pass.
+        pressed = self.pending_presses.pop(0) if self.pending_presses else None
+        self.game_tick(pressed)
+
+    def _flush_display(self):
+        if self.display.flush_pending:
+            self.display.flush()
+
+    def report(self):
+        for stats in self.stats:
+            print(stats.report())
+        print(f"dropped presses: {self.dropped_presses}")
+
+    async def _report_loop(self):
+        while True:
+            await asyncio.sleep(config.ASYNC_REPORT_INTERVAL_MS / 1000)
+            self.report()
+
+    async def main(self, duration_ms=0):
+        # Runs all tasks. With duration_ms > 0 they are stopped after that time (useful on a PC).
+        works = (self._poll_input, self._step_game, self._flush_display, self.audio.tick, self.leds.tick)
+        tasks = [asyncio.create_task(_periodic(stats, work)) for stats, work in zip(self.stats, works)]
+        if config.ASYNC_REPORT_INTERVAL_MS > 0:
+            tasks.append(asyncio.create_task(self._report_loop()))
+        if duration_ms > 0:
+            await asyncio.sleep(duration_ms / 1000)
+            for task in tasks:
+                task.cancel()
+            # Give the cancelled tasks a chance to finish before returning.
+            await asyncio.sleep(0)
+        else:
+            while True:
+                await asyncio.sleep(1)
+
+
+def run(game_tick, poll_input, display, audio, leds, duration_ms=0):
+    runtime = AsyncRuntime(game_tick, poll_input, display, audio, leds)
+    asyncio.run(runtime.main(duration_ms))
+    return runtime
@@ -1,5 +1,6 @@
 # audio_manager.py
 # This module handles all sound effects.
+# Tones are queued and played by a small sequencer, so none of the play_* calls block the game loop.
 
 import machine
 import utime
@@ -8,13 +9,88 @@ import config
 class AudioManager:
     def __init__(self):
         self.pwm = machine.PWM(machine.Pin(config.BUZZER_PIN))
+        # Pending tones as (frequency, duration_ms). A frequency of 0 is a rest.
+        self._queue = []
+        self._playing = False
+        self._step_end = 0  # Timestamp (in ms) when the current tone should stop.
+        self.dropped = 0    # Tones thrown away because the queue was full.
+        # With a core 1 worker (see core1_worker.py) the sequencer runs there and the play_*
+        # calls only post the tones to it.
+        self.worker = None
+        # With a timer the sequencer runs on its own, otherwise main.py calls tick() every loop.
+        self._timer = None
+        if config.AUDIO_TIMER_PERIOD_MS > 0:
+            self._timer = machine.Timer(period=config.AUDIO_TIMER_PERIOD_MS, mode=machine.Timer.PERIODIC, callback=self._on_timer)
         print("Audio Manager --> Ready")
 
     def _play_tone(self, frequency, duration):
+        # Queues a tone and returns immediately. 'duration' is in seconds.
+        if self.worker is not None:
+            if not self.worker.post_tone(frequency, int(duration * 1000)):
+                self.dropped += 1
+            return
+        self.queue_tone(frequency, int(duration * 1000))
+
+    def queue_tone(self, frequency, duration_ms):
+        # Adds a tone to the sequencer. Called on the core that runs the sequencer.
+        if len(self._queue) >= config.AUDIO_QUEUE_LENGTH:
+            self.dropped += 1
+            return
+        self._queue.append((frequency, duration_ms))
+        # In timer mode only the timer callback touches the PWM, so the two never race.
+        if self._timer is None and not self._playing:
+            self._start_next(utime.ticks_ms())
+
+    def _start_next(self, now):
+        # Starts the next queued tone, or silences the buzzer when the queue is empty.
+        if not self._queue:
+            self.pwm.duty_u16(0)
+            self._playing = False
+            return
+        frequency, duration_ms = self._queue.pop(0)
         if frequency > 0:
             self.pwm.freq(frequency)
             self.pwm.duty_u16(2000) # Volume
-        utime.sleep(duration)
+        else:
+            self.pwm.duty_u16(0)
+        self._step_end = utime.ticks_add(now, duration_ms)
+        self._playing = True
+
+    def tick(self):
+        # Advances the sequencer. Cheap to call when nothing is playing.
+        if self._playing:
+            now = utime.ticks_ms()
+            if utime.ticks_diff(now, self._step_end) >= 0:
+                self._start_next(now)
+        elif self._queue:
+            self._start_next(utime.ticks_ms())
+
+    def _on_timer(self, timer):
+        self.tick()
+
+    def attach_worker(self, worker):
+        # Hands the sequencer over to core 1, which from now on calls tick() itself.
+        if self._timer is not None:
+            self._timer.deinit()
+            self._timer = None
+        self.worker = worker
+
+    def is_busy(self):
+        # True while a tone is playing or waiting in the queue.
+        if self.worker is not None and self.worker.pending() > 0:
+            return True
+        return self._playing or len(self._queue) > 0
+
+    def stop(self):
+        # Drops all queued tones and silences the buzzer.
+        if self.worker is not None:
+            self.worker.post_stop()
+            return
+        self.stop_now()
+
+    def stop_now(self):
+        self._queue.clear()
+        self._playing = False
         self.pwm.duty_u16(0)
 
     def play_startup(self):
@@ -34,4 +110,4 @@ class AudioManager:
         
     def play_reset(self):
         self._play_tone(392, 0.05)
-        self._play_tone(262, 0.1)
\ No newline at end of file
+        self._play_tone(262, 0.1)
@@ -0,0 +1,192 @@
+# benchmark.py
+# Timing benchmarks for the display code. Runs on the Pico over the REPL
+# (import benchmark; benchmark.main()) and on a PC inside the simulator (Simulator/run_bench.py).
+# Every result is a dict, printed as one JSON line so runs can be compared later.
+
+import gc
+import json
+import utime
+
+try:
+    import tracemalloc  # Only available on CPython.
+except ImportError:
+    tracemalloc = None
+
+
+class AllocMeter:
+    # Measures how many bytes a piece of code allocates.
+    # On the Pico: growth of gc.mem_alloc() with the collector paused.
+    # On CPython: the tracemalloc peak above the starting point.
+
+    def start(self):
+        gc.collect()
+        if tracemalloc is not None:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+            self._base = tracemalloc.get_traced_memory()[0]
+        else:
+            gc.disable()
+            self._base = gc.mem_alloc()
+
+    def stop(self):
+        if tracemalloc is not None:
+            used = tracemalloc.get_traced_memory()[1] - self._base
+            # Tracing slows everything down, so it only runs inside start()/stop().
+            tracemalloc.stop()
+            return used
+        used = gc.mem_alloc() - self._base
+        gc.enable()
+        return used
+
+
+def measure(name, display, func, iterations=20, before=None, alloc_iterations=3):
+    # Calls func() 'iterations' times and reports the averages per call.
+    # before() runs untimed ahead of every call, e.g. to draw a different screen first.
+    # Allocations are counted in a separate, shorter pass so measuring them doesn't skew the times.
+    oled = display.oled
+    total_us = 0
+    max_us = 0
+    total_bytes = 0
+    total_tx = 0
+    for _ in range(iterations):
+        if before is not None:
+            before()
+        bytes_before = oled.bytes_sent
+        tx_before = oled.transactions
+        start = utime.ticks_us()
+        func()
+        elapsed = utime.ticks_diff(utime.ticks_us(), start)
+        total_us += elapsed
+        if elapsed > max_us:
+            max_us = elapsed
+        total_bytes += oled.bytes_sent - bytes_before
+        total_tx += oled.transactions - tx_before
+
+    alloc_bytes = 0
+    meter = AllocMeter()
+    for _ in range(alloc_iterations):
+        if before is not None:
+            before()
+        meter.start()
+        func()
+        alloc_bytes += meter.stop()
+
+    result = {
+        "name": name,
+        "iterations": iterations,
+        "us_per_call": total_us // iterations,
+        "us_max": max_us,
+        "i2c_bytes_per_call": total_bytes // iterations,
+        "alloc_bytes_per_call": alloc_bytes // alloc_iterations,
+        "i2c_transactions_per_call": total_tx // iterations,
+    }
+    return result
+
+
+def display_suite(display, state, iterations=20):
+    # Every screen renderer, the raw show() and the HUD update after a bit toggle.
+    state.current_mode = "CLASSIC"
+    state.current_task = 9
+    state.level = 7
+    state.score = 120
+    results = []
+
+    def hud():
+        display.draw_game_hud(state)
+
+    screens = (
+        ("draw_main_menu", display.draw_main_menu),
+        ("draw_game_hud", hud),
+        ("draw_feedback_screen", lambda: display.draw_feedback_screen(True, 10)),
+        ("draw_game_over_screen", lambda: display.draw_game_over_screen(120)),
+        ("draw_warning_screen", lambda: display.draw_warning_screen("Mode", "Unlocked")),
+        ("draw_win_screen", lambda: display.draw_win_screen(200, 180, True)),
+        ("draw_info_screen", lambda: display.draw_info_screen("NEW MODE", "Unlocked:", "REVERSE Mode")),
+    )
+    for name, draw in screens:
+        # "switch": coming from another screen, so the whole frame changes.
+        other = hud if name == "draw_main_menu" else display.draw_main_menu
+        results.append(measure(name + ":switch", display, draw, iterations, before=other))
+        # "repeat": the same screen again, which the caches and the frame diff should make cheap.
+        draw()
+        results.append(measure(name + ":repeat", display, draw, iterations))
+
+    def toggle_and_draw():
+        state.toggle_player_input_bit(0)
+        display.draw_game_hud(state)
+
+    tick = [0]
+
+    def next_second():
+        # Moves the countdown on by one second (cycling through 9..1) ahead of the timed call.
+        tick[0] = tick[0] % 9 + 1
+        state.timer_start_time = utime.ticks_add(utime.ticks_ms(), -tick[0] * 1000)
+
+    # The HUD updates with the text cache (only changed glyphs redrawn) and without (full redraw).
+    runs = display.text_cache
+    enabled = runs.enabled
+    for suffix, use_cache in ((":cached", True), (":uncached", False)):
+        runs.enabled = use_cache and enabled
+        state.time_left = 0
+        hud()
+        results.append(measure("hud_bit_toggle" + suffix, display, toggle_and_draw, iterations))
+        state.time_left = 10
+        hud()
+        results.append(measure("hud_timer_tick" + suffix, display, hud, iterations, before=next_second))
+    runs.enabled = enabled
+    state.time_left = 0
+    results.append({
+        "name": "text_cache",
+        "bytes": runs.memory_used(),
+        "strips": len(runs._strips),
+        "hits": runs.hits,
+        "misses": runs.misses,
+    })
+
+    oled = display.oled
+    partial = oled.partial
+
+    def full_show():
+        oled.partial = False
+        oled.show()
+        oled.partial = partial
+
+    results.append(measure("ssd1306_show_full", display, full_show, iterations))
+
+    # One tick of the chunked flush right after the whole screen changed (menu <-> feedback).
+    flip = [False]
+
+    def render_other():
+        flip[0] = not flip[0]
+        if flip[0]:
+            display.draw_feedback_screen(True, 10)
+        else:
+            display.draw_main_menu()
+
+    display.deferred = True
+    results.append(measure("flush_step:switch", display, display.flush_step, iterations, before=render_other))
+    display.flush()
+    display.deferred = False
+    results.append({"name": "flush_step", "superseded": display.superseded})
+    return results
+
+
+def print_results(results):
+    for result in results:
+        print(json.dumps(result))
+
+
+def main(iterations=20):
+    # Entry point for running on the Pico.
+    import display_manager
+    import game_state
+    display = display_manager.Display()
+    state = game_state.GameState()
+    results = display_suite(display, state, iterations)
+    print_results(results)
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+# boot_profiler.py
+# Measures how long each module import and each constructor takes at power-on, and creates
+# non-critical objects (audio, LEDs) lazily, on their first use, so the menu comes up sooner.
+#
+#     profiler = boot_profiler.BootProfiler()
+#     display_manager = profiler.load("display_manager")
+#     display = profiler.create("Display", display_manager.Display)
+#     profiler.lazy(globals(), "audio", "audio_manager", "AudioManager")
+#     ...
+#     profiler.report(200)
+#
+# Not named boot.py, MicroPython runs a file with that name by itself before main.py.
+
+import utime
+
+# Microsecond clock for the measurements (replaceable, like tracing.clock).
+clock = utime.ticks_us
+
+
+class _Lazy:
+    # Stands in for an object until its first attribute access, then creates it and puts
+    # the real object in its place in the namespace, so later lookups skip this stand-in.
+
+    def __init__(self, profiler, namespace, name, module, cls):
+        self._profiler = profiler
+        self._namespace = namespace
+        self._name = name
+        self._module = module
+        self._cls = cls
+        self._obj = None
+
+    def __getattr__(self, attr):
+        obj = self._obj
+        if obj is None:
+            module = self._profiler.load(self._module)
+            obj = self._profiler.create(self._cls + " (lazy)", getattr(module, self._cls))
+            self._obj = obj
+            self._namespace[self._name] = obj
+        return getattr(obj, attr)
+
+
+class BootProfiler:
+    # Collects (step, microseconds) pairs from main.py start until report().
+
+    def __init__(self):
+        self.start = clock()
+        self.steps = []
+        self.reported = False
+
+    def _record(self, step, start):
+        used = utime.ticks_diff(clock(), start)
+        self.steps.append((step, used))
+        if self.reported:
+            # Created on first use after the boot report.
+            print(f"Boot: {step} took {used} us")
+
+    def load(self, module):
+        # Imports a module (including the modules it imports itself) and times it.
+        start = clock()
+        result = __import__(module)
+        self._record("import " + module, start)
+        return result
+
+    def create(self, step, factory):
+        start = clock()
+        obj = factory()
+        self._record(step, start)
+        return obj
+
+    def lazy(self, namespace, name, module, cls):
+        # Binds namespace[name] to a stand-in that imports module and creates module.cls on first use.
+        namespace[name] = _Lazy(self, namespace, name, module, cls)
+
+    def report(self, target_ms):
+        # Prints every step and the time until now, which main.py calls when the menu is responsive.
+        total = utime.ticks_diff(clock(), self.start)
+        print("--- boot profile ---")
+        for step, used in self.steps:
+            print(f"{step:28} {used:8} us")
+        print(f"menu ready {total // 1000} ms after main.py started, {utime.ticks_ms()} ms after power-on (target {target_ms} ms)")
+        self.reported = True
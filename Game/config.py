@@ -7,6 +7,8 @@ PIN_SDA = 0
 DISPLAY_WIDTH = 128
 DISPLAY_HEIGHT = 64
 I2C_ADDRESS = 0x3C
+DISPLAY_PARTIAL_FLUSH = True # Posielať iba stĺpce, ktoré sa od posledného odoslania zmenili (porovnanie s kópiou v display_manager), inak celý buffer
+DISPLAY_FLUSH_PAGES_PER_TICK = 2 # Koľko stránok sa pošle na displej za jeden tik hlavnej slučky (0 = celý obraz naraz)
 
 # Tlačidlá (podľa tvojej dokumentácie)
 BUTTON_PINS = {
@@ -18,11 +20,67 @@ BUTTON_PINS = {
     "Cancel": 7
 }
 
+# Časovanie tlačidiel (každé tlačidlo má vlastný stav, takže sa navzájom neblokujú)
+BUTTON_DEBOUNCE_MS = 30  # Hrany, ktoré prídu skôr po poslednej zmene, sú zákmity kontaktu
+BUTTON_HOLD_MS = 800     # Po akom čase podržania príde udalosť HOLD (0 = nikdy)
+BUTTON_REPEAT_MS = 0     # Interval udalostí REPEAT po HOLD (0 = bez opakovania)
+# Výnimky pre konkrétne tlačidlá: meno -> (debounce_ms, hold_ms, repeat_ms)
+BUTTON_TIMINGS = {
+    "Cancel": (30, 3000, 0),  # Podržanie Cancel na 3 s = DEV cheat (preskočenie levelov)
+}
+INPUT_USE_IRQ = True          # Zachytávať hrany tlačidiel prerušením (False = pôvodné čítanie pinov v slučke)
+INPUT_EVENT_BUFFER_SIZE = 32  # Veľkosť kruhového buffra hrán z prerušení
+
 # Výstupy
 BUZZER_PIN = 10
 GREEN_LED_PIN = 14  # Pre budúce použitie
 RED_LED_PIN = 15    # Pre budúce použitie
+LED_TIMER_PERIOD_MS = 0 # Perióda machine.Timer pre LED vzory (0 = posúva ich leds.tick() z hlavnej slučky)
+
+# Zvuk
+AUDIO_TIMER_PERIOD_MS = 0 # Perióda machine.Timer pre sekvencér tónov (0 = posúva ho audio.tick() z hlavnej slučky)
+AUDIO_QUEUE_LENGTH = 16   # Max. počet tónov čakajúcich vo fronte
 
 # Herné Nastavenia
-DEBOUNCE_DELAY_MS = 200 # Pauza medzi stlačeniami v milisekundách
+BIT_WIDTH = 4 # Počet bitov úlohy: 4, 8, 12 alebo 16. Nad 4 bity sa zadáva po skupinách (bankách) 4 bitov
+LOOKUP_TABLE_MAX_BITS = 8 # Do akej šírky úlohy sa pri štarte predpočítajú tabuľky textov (2^bity položiek)
 FEEDBACK_DURATION_MS = 1500 # Ako dlho sa zobrazí obrazovka "Správne/Nesprávne"
+DIFFICULTY_FILE = "difficulty.txt" # Tabuľka obtiažnosti (úrovne, módy, časové limity, hlásenia) - načíta sa raz pri štarte
+SCREEN_CACHE_MAX_BYTES = 4096 # Pamäť pre hotové statické obrazovky (1 KB na obrazovku, 0 = vypnuté)
+TEXT_CACHE_MAX_BYTES = 1024   # Pamäť pre predkreslené nápisy a znaky HUD (0 = vypnuté, kreslí sa celý HUD)
+
+# Ukladanie najvyššieho skóre (flash)
+HIGHSCORE_LOG_FILE = "highscore.log" # Log záznamov skóre s pevnou veľkosťou, každé uloženie zapíše ďalší slot
+HIGHSCORE_LOG_SLOTS = 256            # Počet 16 B slotov, po zaplnení sa log zhustí (1 zmazanie bloku)
+FLASH_ERASE_BLOCK = 4096             # Veľkosť mazaného bloku flash pamäte Pico
+FLASH_ENDURANCE_CYCLES = 100000      # Koľko zmazaní blok flash vydrží (podľa datasheetu)
+
+# Telemetria (záznam každého kola pre ladenie obtiažnosti)
+TELEMETRY_ENABLED = True         # Zapisovať záznamy kôl (úroveň, mód, úloha, čas odpovede, výsledok)
+TELEMETRY_FILE = "telemetry.bin" # Binárny súbor, do CSV ho prevedie Simulator/decode_telemetry.py
+TELEMETRY_BUFFER_RECORDS = 64    # Koľko záznamov sa drží v RAM, na flash sa zapíšu až na obrazovke menu/výhry/konca hry
+
+# Beh programu
+BOOT_LAZY_INIT = True # Zvuk a LED sa vytvoria až pri prvom použití, menu je tak skôr pripravené
+BOOT_PROFILE = True   # Vypísať pri štarte časy importov a konštruktorov
+BOOT_TARGET_MS = 200  # Cieľový čas od zapnutia po ovládateľné menu
+TICK_BUDGET_MS = 10            # Cieľová dĺžka jedného tiku hlavnej slučky, spí sa iba zvyšok (dlhší tik = prekročenie)
+IDLE_TICK_MS = 40              # Pomalší tik na obrazovkách, ktoré iba čakajú na tlačidlo (keď nehrá zvuk ani LED)
+IDLE_TICK_SCREENS = ("MENU", "GAME_OVER", "WIN", "INFO", "DEBUG") # Obrazovky s pomalým tikom
+IDLE_LIGHTSLEEP = False        # Na pomalom tiku použiť machine.lightsleep (prebudí ho tlačidlo, vypne USB konzolu)
+DUAL_CORE = False              # Posielanie obrazu na displej a sekvencér tónov beží na druhom jadre (_thread)
+CORE1_QUEUE_LENGTH = 16        # Max. počet príkazov (obraz, tón) čakajúcich na druhé jadro
+CORE1_IDLE_MS = 1              # Ako dlho druhé jadro čaká, keď nemá žiadny príkaz
+USE_ASYNC_RUNTIME = False      # True = vstup, logika, displej, zvuk a LED bežia ako samostatné uasyncio úlohy
+ASYNC_INPUT_PERIOD_MS = 5      # Ako často sa čítajú tlačidlá
+ASYNC_GAME_PERIOD_MS = 10      # Ako často beží stavový automat hry
+ASYNC_DISPLAY_PERIOD_MS = 20   # Ako často sa posiela pripravený obraz na displej
+ASYNC_AUDIO_PERIOD_MS = 5      # Ako často sa posúva sekvencér tónov
+ASYNC_LED_PERIOD_MS = 10       # Ako často sa posúvajú LED vzory
+ASYNC_INPUT_QUEUE_LENGTH = 8   # Max. počet stlačení čakajúcich na spracovanie
+ASYNC_REPORT_INTERVAL_MS = 0   # Ako často vypísať štatistiky oneskorenia úloh (0 = nikdy)
+GC_IDLE_SCREENS = ("MENU", "FEEDBACK", "INFO", "GAME_OVER", "WIN") # Obrazovky, pri ktorých vstupe sa spustí gc.collect() (nikdy počas kola)
+HEAP_SAMPLE_TICKS = 50         # Každých koľko tikov sa zmeria voľná a použitá pamäť (meranie prechádza celú haldu)
+TRACE_ENABLED = False          # Meranie trvania častí hlavnej slučky (výpis: podržať Confirm + Cancel)
+TRACE_BUFFER_SIZE = 1024       # Počet posledných meraní, ktoré sa uchovávajú
+ASYNC_RUN_DURATION_MS = 0      # Po akom čase asyncio beh skončí (0 = nikdy, iné hodnoty pre simulátor)
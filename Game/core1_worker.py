@@ -0,0 +1,156 @@
+# core1_worker.py
+# Runs the display transfers and the tone sequencer on the RP2040's second core, so a flush
+# over I2C and the tone timing no longer hold up input handling and the game logic on core 0.
+#
+# Core 0 hands work over through a small command queue protected by a lock:
+#
+#     FLUSH   send the frame that Display.prepare_flush() copied into its shadow buffer
+#     TONE    queue a tone (frequency, duration in ms) in the AudioManager sequencer
+#     STOP    silence the buzzer and drop the queued tones
+#
+# Between commands core 1 advances the sequencer, so it is the only core that touches the
+# I2C bus and the PWM. The queue is preallocated, posting a command allocates nothing.
+#
+# On the Pico the worker is started with _thread (MicroPython runs the new thread on core 1).
+# On a PC (simulator) it runs on a threading.Thread with the same queue and the same locking.
+
+import array
+import _thread
+import utime
+import config
+
+try:
+    import threading  # CPython only, the simulator
+except ImportError:
+    threading = None
+
+FLUSH = 1
+TONE = 2
+STOP = 3
+
+# How core 1 waits when the queue is empty (replaceable: the simulator uses a wall clock sleep,
+# so the worker thread doesn't move its virtual clock).
+pause = utime.sleep_ms
+
+
+class Core1Worker:
+    # Owns the display transfers and the audio sequencer once start() was called.
+
+    def __init__(self, display, audio, length=config.CORE1_QUEUE_LENGTH):
+        self.display = display
+        self.audio = audio
+        self._lock = _thread.allocate_lock()
+        # Ring buffer of commands and their two arguments. Core 0 only moves _head,
+        # core 1 only moves _tail, both under the lock.
+        self._command = bytearray(length)
+        self._arg1 = array.array("i", [0] * length)
+        self._arg2 = array.array("i", [0] * length)
+        self._length = length
+        self._head = 0
+        self._tail = 0
+        self._count = 0
+        # Set by core 0 when it posts a frame, cleared by core 1 when the frame is sent.
+        self.flush_busy = False
+        self.running = False
+        self.stopped = True
+        # Statistics.
+        self.dropped = 0       # commands lost because the queue was full
+        self.flushes = 0
+        self.flush_waits = 0   # ticks a rendered frame waited for the previous send to finish
+        self.max_flush_us = 0
+
+    # --- Core 0 side ---
+
+    def post(self, command, arg1=0, arg2=0):
+        # Queues a command for core 1. Returns False (and counts it) when the queue is full.
+        self._lock.acquire()
+        if self._count == self._length:
+            self._lock.release()
+            self.dropped += 1
+            return False
+        head = self._head
+        self._command[head] = command
+        self._arg1[head] = arg1
+        self._arg2[head] = arg2
+        self._head = (head + 1) % self._length
+        self._count += 1
+        self._lock.release()
+        return True
+
+    def post_tone(self, frequency, duration_ms):
+        return self.post(TONE, frequency, duration_ms)
+
+    def post_stop(self):
+        return self.post(STOP)
+
+    def submit_frame(self):
+        # Call once per tick on core 0. Hands a rendered frame to core 1 unless the previous one
+        # is still being sent, then the frame stays pending and a later call sends the newest.
+        display = self.display
+        if not display.flush_pending:
+            return
+        if self.flush_busy:
+            self.flush_waits += 1
+            return
+        display.prepare_flush()
+        self.flush_busy = True
+        if not self.post(FLUSH):
+            self.flush_busy = False
+            display.flush_pending = True
+
+    def pending(self):
+        return self._count
+
+    def start(self):
+        # Takes over the display flushes and the sequencer and starts the loop on the other core.
+        self.display.deferred = True
+        self.audio.attach_worker(self)
+        self.running = True
+        self.stopped = False
+        if threading is not None:
+            threading.Thread(target=self._run, daemon=True).start()
+        else:
+            _thread.start_new_thread(self._run, ())
+
+    def stop(self):
+        # Asks the loop to end and waits for it, e.g. before the simulator exits.
+        self.running = False
+        while not self.stopped:
+            pause(1)
+
+    # --- Core 1 side ---
+
+    def _run(self):
+        audio = self.audio
+        lock = self._lock
+        while self.running:
+            # Take the oldest command (0 = queue empty), without building a tuple for it.
+            command = 0
+            lock.acquire()
+            if self._count > 0:
+                tail = self._tail
+                command = self._command[tail]
+                arg1 = self._arg1[tail]
+                arg2 = self._arg2[tail]
+                self._tail = (tail + 1) % self._length
+                self._count -= 1
+            lock.release()
+            if command == FLUSH:
+                start = utime.ticks_us()
+                self.display.send_prepared()
+                used = utime.ticks_diff(utime.ticks_us(), start)
+                if used > self.max_flush_us:
+                    self.max_flush_us = used
+                self.flushes += 1
+                self.flush_busy = False
+            elif command == TONE:
+                audio.queue_tone(arg1, arg2)
+            elif command == STOP:
+                audio.stop_now()
+            audio.tick()
+            if command == 0:
+                pause(config.CORE1_IDLE_MS)
+        self.stopped = True
+
+    def report(self):
+        print(f"Core 1: {self.flushes} flushes (max {self.max_flush_us} us), {self.flush_waits} waits for a send, {self.dropped} commands dropped")
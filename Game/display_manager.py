@@ -6,7 +6,14 @@
 import utime
 import machine
 from ssd1306 import SSD1306_I2C
+from screen_cache import ScreenCache
+from text_cache import TextCache, format_int, format_bits
 import config
+import tracing
+
+# Text runs of the HUD, see TextCache.draw_run().
+_RUN_TIME = 0
+_RUN_INPUT = 1
 
 class Display:
     # Manages the OLED display hardware and provides methods to draw game screens.
@@ -17,8 +24,156 @@ class Display:
         i2c = machine.I2C(0, scl=machine.Pin(config.PIN_SCL), sda=machine.Pin(config.PIN_SDA))
         # Create an instance of the display driver.
         self.oled = SSD1306_I2C(config.DISPLAY_WIDTH, config.DISPLAY_HEIGHT, i2c, config.I2C_ADDRESS)
+        # Only push the pages that changed since the last flush (see SSD1306.show).
+        self.oled.partial = config.DISPLAY_PARTIAL_FLUSH
+        # Shadow copy of what the panel is currently showing. The driver clears the
+        # panel on init, so an all-zero buffer matches it from the start.
+        self._shadow = bytearray(len(self.oled.buffer))
+        self._shadow_view = memoryview(self._shadow)
+        self._frame_view = memoryview(self.oled.buffer)
+        # Column ranges handed from prepare_flush() to send_prepared().
+        self._send_x0 = bytearray(self.oled.pages)
+        self._send_x1 = bytearray(self.oled.pages)
+        # Rendered copies of static screens (menu, game over, warnings, info banners).
+        self.screen_cache = ScreenCache(len(self.oled.buffer))
+        # Pre-rasterised labels and glyphs, and what the HUD currently shows.
+        self.text_cache = TextCache(self.oled, runs=2)
+        # What the HUD on screen was drawn for, a change in any of these redraws it completely.
+        self._hud_shown = False
+        self._hud_task = None
+        self._hud_mode = None
+        self._hud_time_left = 0
+        self._hud_level = 0
+        self._hud_score = 0
+        # When deferred, draw_* methods only render into the buffer and flush() is called separately.
+        self.deferred = False
+        self.flush_pending = False
+        self._render_start = 0  # trace timestamp of the frame being rendered
+        self.frames = 0         # number of frames rendered so far, also the frame generation
+        # Chunked flush (see flush_step): the frame and the page the interrupted flush is at.
+        self._chunk_frame = 0
+        self._chunk_page = 0
+        self.superseded = 0     # chunked flushes abandoned for a newer frame
+        # Text buffers of the HUD fields that change during a round, filled in place.
+        self._time_text = bytearray(b"Time: " + bytes(6))
+        self._input_text = bytearray(b"Input: " + bytes(4))
+        self._sum_text = bytearray(b"Sum: " + bytes(12))
         print("Display Manager --> Ready")
 
+    def _flush(self):
+        # Called at the end of every draw_* method. In deferred mode the frame is only
+        # marked as pending and a separate task pushes it later with flush().
+        tracing.end(tracing.SPAN_RENDER, self._render_start)
+        self.frames += 1
+        if self.deferred:
+            self.flush_pending = True
+            return
+        self.flush()
+
+    def flush(self):
+        # Pushes the frame to the panel, sending only the bytes that differ from the shadow copy,
+        # so identical re-renders cost no I2C traffic at all.
+        start = tracing.begin()
+        self.flush_pending = False
+        if self.oled.partial:
+            self._trim_to_changes()
+        self.oled.show()
+        tracing.end(tracing.SPAN_FLUSH, start)
+
+    def flush_step(self, max_pages=config.DISPLAY_FLUSH_PAGES_PER_TICK):
+        # Non-blocking flush for deferred mode: sends at most max_pages changed pages of the pending
+        # frame and returns, the main loop calls it again on the next tick until flush_pending is
+        # False. If a newer frame was rendered in between, the scan starts over at the top for it
+        # instead of finishing the old one first: pages already sent that changed again are dirty
+        # again, pages not sent yet go out with the newer content.
+        if not self.flush_pending:
+            return
+        start = tracing.begin()
+        oled = self.oled
+        if self._chunk_frame != self.frames:
+            if self._chunk_page > 0:
+                self.superseded += 1
+            self._chunk_frame = self.frames
+            self._chunk_page = 0
+        page = self._chunk_page
+        sent = 0
+        while page < oled.pages and sent < max_pages:
+            if oled.partial:
+                self._trim_page(page)
+            x0, x1 = oled.dirty_span(page)
+            if x0 <= x1 or not oled.partial:
+                oled.show_page(page)
+                sent += 1
+            page += 1
+        if page == oled.pages:
+            page = 0
+            self.flush_pending = False
+            oled.flush_count += 1
+        self._chunk_page = page
+        tracing.end(tracing.SPAN_FLUSH, start)
+
+    def prepare_flush(self):
+        # First half of a flush done by the second core (see core1_worker.py), runs on core 0:
+        # copies what changed into the shadow buffer and takes over the dirty ranges. The frame
+        # buffer is then free for the next frame while send_prepared() sends the shadow copy.
+        # Only call it when the previous send_prepared() has finished.
+        self.flush_pending = False
+        oled = self.oled
+        if oled.partial:
+            self._trim_to_changes()
+        else:
+            self._shadow_view[:] = self._frame_view
+        for page in range(oled.pages):
+            x0, x1 = oled.dirty_span(page)
+            self._send_x0[page] = x0
+            self._send_x1[page] = x1
+            oled.set_dirty_span(page, 1, 0)
+
+    def send_prepared(self):
+        # Second half, runs on core 1: pushes the shadow copy to the panel.
+        if self.oled.partial:
+            self.oled.show_from(self._shadow_view, self._send_x0, self._send_x1)
+        else:
+            self.oled.show_from(self._shadow_view)
+
+    def _trim_to_changes(self):
+        # Narrows the dirty range of every page to the columns that differ from the shadow copy,
+        # and updates the shadow with what is about to be sent.
+        for page in range(self.oled.pages):
+            self._trim_page(page)
+
+    def _trim_page(self, page):
+        oled = self.oled
+        x0, x1 = oled.dirty_span(page)
+        if x0 > x1:
+            return
+        buf = oled.buffer
+        shadow = self._shadow
+        start = page * oled.width
+        # Shrink the dirty range from both ends until it only covers changed columns.
+        while x0 <= x1 and buf[start + x0] == shadow[start + x0]:
+            x0 += 1
+        while x1 >= x0 and buf[start + x1] == shadow[start + x1]:
+            x1 -= 1
+        oled.set_dirty_span(page, x0, x1)
+        if x0 <= x1:
+            self._shadow_view[start + x0 : start + x1 + 1] = self._frame_view[start + x0 : start + x1 + 1]
+
+    def _show_cached(self, key):
+        # Restores a previously rendered screen and flushes it. Returns False on a cache miss,
+        # in which case the caller renders the screen and finishes with _cache_and_flush().
+        self._render_start = tracing.begin()
+        if not self.screen_cache.restore(key, self.oled.buffer):
+            return False
+        self._hud_shown = False
+        self.oled.mark_dirty(0, 0, config.DISPLAY_WIDTH, config.DISPLAY_HEIGHT)
+        self._flush()
+        return True
+
+    def _cache_and_flush(self, key):
+        self.screen_cache.store(key, self.oled.buffer)
+        self._flush()
+
     def _center_text(self, text, y):
         # A helper method to draw text horizontally centered on the screen at a given Y-coordinate.
         # It calculates the required X position based on the text length.
@@ -26,63 +181,142 @@ class Display:
         x = (config.DISPLAY_WIDTH - (len(text) * 8)) // 2
         self.oled.text(text, x, y)
 
+    def _begin_frame(self):
+        # Starts a new frame: clears the buffer and draws the border.
+        self._render_start = tracing.begin()
+        self._hud_shown = False
+        self.oled.fill(0)
+        self._draw_frame()
+
     def _draw_frame(self):
         # Draws a decorative border around the entire screen.
         self.oled.rect(0, 0, config.DISPLAY_WIDTH, config.DISPLAY_HEIGHT, 1)
 
     def draw_main_menu(self):
         # Displays the initial welcome screen with the game title and a prompt to start.
-        self.oled.fill(0)  # Clear the display buffer
-        self._draw_frame()
+        key = ("MENU",)
+        if self._show_cached(key):
+            return
+        self._begin_frame()  # Clear the display buffer
         self._center_text("BINARY CODE", 10)
         self._center_text("BREAKER", 20)
         self._center_text(">Press Confirm<", 45)
-        self.oled.show()  # Push the buffer to the display
+        self._cache_and_flush(key)  # Push the changes to the display
 
     def draw_game_hud(self, state):
         # Renders the main game interface (Heads-Up Display).
         # It shows dynamic information like level, score, time, current task, and player input.
-        self.oled.fill(0)
-        self._draw_frame()
-        
-        # --- Top Status Bar ---
-        # Display the current level on the top-left.
-        self.oled.text(f"Lvl:{state.level}", 5, 5)
-        
-        # Display score and time on the top-right, stacked vertically.
-        score_text = f"Score:{state.score}"
-        score_x = config.DISPLAY_WIDTH - (len(score_text) * 8) - 5 # Position 5px from the right edge
-        self.oled.text(score_text, score_x, 5)
+        # While the same round stays on screen, only the time and the input are redrawn, glyph by
+        # glyph (see text_cache.py). A new round, or any other screen in between, redraws everything.
+        runs = self.text_cache
+        width = config.BIT_WIDTH
+        mode_label = "Mode: D->B" if state.current_mode == "CLASSIC" else "Mode: B->D"
+        if (not self._hud_shown or not runs.enabled or self._hud_task != state.current_task
+                or self._hud_mode != state.current_mode or self._hud_time_left != state.time_left
+                or self._hud_level != state.level or self._hud_score != state.score):
+            self._begin_frame()
+            runs.reset()
+            self._hud_shown = True
+            self._hud_task = state.current_task
+            self._hud_mode = state.current_mode
+            self._hud_time_left = state.time_left
+            self._hud_level = state.level
+            self._hud_score = state.score
+
+            # --- Top Status Bar ---
+            # Display the current level on the top-left.
+            runs.draw("Lvl:", 5, 5)
+            self.oled.text(str(state.level), 37, 5)
+            # Display score and time on the top-right, stacked vertically.
+            score_text = f"Score:{state.score}"
+            score_x = config.DISPLAY_WIDTH - (len(score_text) * 8) - 5 # Position 5px from the right edge
+            self.oled.text(score_text, score_x, 5)
+
+            # --- Task Information ---
+            # Show the current game mode (Decimal to Binary or vice-versa).
+            runs.draw(mode_label, 5, 22)
+            # Display the specific task (e.g., the number to convert), in binary for REVERSE mode.
+            if state.task_text is not None:
+                self.oled.text(state.task_text, 5, 34)
+            elif state.current_mode == "CLASSIC":
+                self.oled.text(f"Task: {state.current_task}", 5, 34)
+            elif width <= 8:
+                self.oled.text("Task: " + self._binary(state.current_task, width), 5, 34)
+            else:
+                # 12 or 16 digits don't fit next to the label, so the bits are drawn as boxes.
+                self._draw_bits(state.current_task, width, 34, -1)
+        else:
+            self._render_start = tracing.begin()
 
         # Calculate and display the remaining time if the timer is active.
+        # The changing fields are written into preallocated buffers, no strings are created.
         if state.time_left > 0:
             elapsed_seconds = utime.ticks_diff(utime.ticks_ms(), state.timer_start_time) // 1000
-            remaining_time = state.time_left - elapsed_seconds
-            time_str = f"Time: {max(0, remaining_time)}" # Ensure time doesn't go below zero
-            time_x = config.DISPLAY_WIDTH - (len(time_str) * 8) - 5
-            self.oled.text(time_str, time_x, 15) # Display below the score
-
-        # --- Task Information ---
-        # Show the current game mode (Decimal to Binary or vice-versa).
-        mode_str = "D->B" if state.current_mode == "CLASSIC" else "B->D"
-        self.oled.text(f"Mode: {mode_str}", 5, 22)
-        # Display the specific task (e.g., the number to convert).
-        self.oled.text(f"Task: {state.current_task}", 5, 34)
+            remaining_time = max(0, state.time_left - elapsed_seconds) # Ensure time doesn't go below zero
+            if runs.changed(_RUN_TIME, remaining_time):
+                length = format_int(self._time_text, 6, remaining_time)
+                time_x = config.DISPLAY_WIDTH - (length * 8) - 5
+                runs.draw_run(_RUN_TIME, self._time_text, length, time_x, 15) # Display below the score
+                # The bottom row of the time touches the top row of the mode line, put back
+                # whatever erasing the old digits took away from it.
+                runs.draw(mode_label, 5, 22)
 
         # --- Player Input Area ---
         # Display the player's current input, which varies by game mode.
+        # Everything here stays inside page 6 (y 48-55), so a bit toggle updates one page only.
         if state.current_mode == "CLASSIC": # Binary input
-            self.oled.text(f"Input: {state.player_input_str}", 5, 50)
+            # The input is kept as an integer and only formatted here, at render time.
+            if width == 4:
+                if runs.changed(_RUN_INPUT, state.player_input):
+                    length = format_bits(self._input_text, 7, state.player_input, 4)
+                    runs.draw_run(_RUN_INPUT, self._input_text, length, 5, 48)
+            elif runs.changed(_RUN_INPUT, (state.player_input << 2) | state.input_bank):
+                self.oled.fill_rect(1, 48, config.DISPLAY_WIDTH - 2, 8, 0)
+                self._draw_bits(state.player_input, width, 48, state.input_bank)
         else: # REVERSE Mode - Decimal input from binary bits
-            self.oled.text(f"Sum: {state.player_sum}", 5, 50)
+            text = self._sum_text
+            if width == 4:
+                if runs.changed(_RUN_INPUT, state.player_sum):
+                    length = format_int(text, 5, state.player_sum)
+                    runs.draw_run(_RUN_INPUT, text, length, 5, 48)
+            elif runs.changed(_RUN_INPUT, (state.player_sum << 2) | state.input_bank):
+                # "Sum:N Bb/B", the sum and which bank of how many is being entered.
+                banks = width >> 2
+                length = format_int(text, 4, state.player_sum)
+                text[length] = 0x20
+                text[length + 1] = 0x42  # "B"
+                length = format_int(text, length + 2, banks - state.input_bank)
+                text[length] = 0x2F  # "/"
+                length = format_int(text, length + 1, banks)
+                runs.draw_run(_RUN_INPUT, text, length, 5, 48)
             
-        self.oled.show()
+        self._flush()
+
+    def _binary(self, value, width):
+        # Formats a value as a binary string with leading zeros.
+        digits = bin(value)[2:]
+        return "0" * (width - len(digits)) + digits
+
+    def _draw_bits(self, value, width, y, active_bank):
+        # Draws the bits of a value as 6x6 boxes (filled = 1), most significant bit first,
+        # in groups of four. The bank being edited is underlined; pass -1 for no underline.
+        span = width * 7 + ((width >> 2) - 1) * 3 - 1
+        x = (config.DISPLAY_WIDTH - span) // 2
+        for bit in range(width - 1, -1, -1):
+            if (value >> bit) & 1:
+                self.oled.fill_rect(x, y, 6, 6, 1)
+            else:
+                self.oled.rect(x, y, 6, 6, 1)
+            if (bit >> 2) == active_bank:
+                self.oled.hline(x, y + 7, 6, 1)
+            x += 7
+            if bit & 3 == 0:
+                x += 3
 
     def draw_feedback_screen(self, is_correct, score_change, message=""):
         # Shows a temporary screen after the player submits an answer,
         # indicating if it was correct and the points awarded or deducted.
-        self.oled.fill(0)
-        self._draw_frame()
+        self._begin_frame()
         
         # Display a custom message if provided, otherwise default to "CORRECT!" or "WRONG".
         if message:
@@ -94,31 +328,34 @@ class Display:
             
         # Show how many points the player's score changed by.
         self._center_text(f"{score_change} points", 40)
-        self.oled.show()
+        self._flush()
         
     def draw_game_over_screen(self, final_score):
         # Displays the game over message with the final score and a prompt to restart.
-        self.oled.fill(0)
-        self._draw_frame()
+        key = ("GAME_OVER", final_score)
+        if self._show_cached(key):
+            return
+        self._begin_frame()
         self._center_text("GAME OVER", 15)
         self._center_text(f"Score: {final_score}", 30)
         self._center_text("> Restart <", 45)
-        self.oled.show()
+        self._cache_and_flush(key)
 
     # --- NEW FUNCTION ---
     def draw_warning_screen(self, line1, line2):
         # Displays a special notification screen for achievements like unlocking a new mode.
-        self.oled.fill(0)
-        self._draw_frame()
+        key = ("WARNING", line1, line2)
+        if self._show_cached(key):
+            return
+        self._begin_frame()
         self._center_text("! WARNING !", 10)
         self._center_text(line1, 28)
         self._center_text(line2, 40)
-        self.oled.show()
+        self._cache_and_flush(key)
 
     def draw_win_screen(self, final_score, high_score, is_new_record):
         # Displays the victory screen with scores and a prompt to play again.
-        self.oled.fill(0)
-        self._draw_frame()
+        self._begin_frame()
 
         # Use the new boolean to decide which title to show
         if is_new_record:
@@ -137,15 +374,24 @@ class Display:
         # Prompt to play again.
         self._center_text("> Play Again <", 50)
         
-        self.oled.show()
+        self._flush()
+
+    def draw_debug_screen(self, lines):
+        """Shows the heap statistics, up to 7 lines of 15 characters inside the border."""
+        self._begin_frame()
+        for row in range(min(len(lines), 7)):
+            self.oled.text(lines[row], 4, 4 + row * 8)
+        self._flush()
 
     def draw_info_screen(self, title, line1, line2=""):
         """Zobrazí oznamovaciu obrazovku pre nové funkcie."""
-        self.oled.fill(0)
-        self._draw_frame()
+        key = ("INFO", title, line1, line2)
+        if self._show_cached(key):
+            return
+        self._begin_frame()
         self._center_text(f"!!! {title} !!!", 15)
         self._center_text(line1, 30)
         if line2:
             self._center_text(line2, 40)
         self._center_text("> Continue <", 52)
-        self.oled.show()
\ No newline at end of file
+        self._cache_and_flush(key)
\ No newline at end of file
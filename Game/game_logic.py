@@ -1,68 +1,141 @@
 # game_logic.py
 # This module contains all the game's "rules" and logic calculations.
+# Everything that can be worked out in advance (binary strings, HUD texts, the level
+# progression) is put into lookup tables at startup, so a round only does indexed lookups.
+# The difficulty curve itself comes from a small table file (config.DIFFICULTY_FILE).
 
+import gc
 import random
+import utime
+import config
+
+# Letters used for the game modes in the difficulty file.
+MODE_NAMES = {"C": "CLASSIC", "R": "REVERSE"}
 
 class GameLogic:
     # Handles the core mechanics of the game, such as task generation and answer validation.
 
-    def __init__(self):
-        # Defines the decimal values for each of the 4 bits (from right to left).
-        self.bit_values = [1, 2, 4, 8]
+    def __init__(self, difficulty_file=config.DIFFICULTY_FILE):
+        # Number of bits in a task and the largest number that fits in them.
+        self.bit_width = config.BIT_WIDTH
+        self.max_value = (1 << self.bit_width) - 1
+        # Defines the decimal values for each bit (from right to left).
+        self.bit_values = [1 << bit for bit in range(self.bit_width)]
+
+        # value -> binary string / task text. A table per value needs 2^bits entries, so above
+        # config.LOOKUP_TABLE_MAX_BITS they are skipped and the strings are built when needed.
+        self.binary_strings = None
+        self.task_texts = None
+        if self.bit_width <= config.LOOKUP_TABLE_MAX_BITS:
+            values = range(self.max_value + 1)
+            self.binary_strings = tuple(self._format_binary(n, self.bit_width) for n in values)
+            self.task_texts = {
+                "CLASSIC": tuple(f"Task: {n}" for n in values),
+                "REVERSE": tuple("Task: " + self.binary_strings[n] for n in values),
+            }
+
+        # level -> (modes, time limit in seconds, smallest task, largest task), and
+        # level -> (title, line1, line2) banner or None. Both are indexed directly by level.
+        self.max_level = 0
+        self.level_table = ()
+        self.unlock_banners = ()
+        self.load_difficulty(difficulty_file)
         print("Game Logic --> Ready")
 
-    def decimal_to_binary(self, n):
-        # Converts a decimal number into a 4-digit binary string with leading zeros.
+    def load_difficulty(self, filename):
+        # Parses the difficulty file and expands it into per-level tables.
+        # Reports how long that took and how much RAM the tables use.
+        gc.collect()
+        free_before = gc.mem_free() if hasattr(gc, "mem_free") else 0
+        start = utime.ticks_us()
+
+        rows = []
+        with open(filename, "r") as f:
+            for line in f:
+                line = line.strip()
+                if not line or line[0] == "#":
+                    continue
+                fields = line.split(None, 7)
+                if fields[0] == "win":
+                    self.max_level = int(fields[1])
+                    continue
+                banner = tuple(fields[7].split("|")) if len(fields) > 7 else None
+                if banner is not None and len(banner) < 3:
+                    banner = banner + ("",) * (3 - len(banner))
+                modes = tuple(MODE_NAMES[letter] for letter in fields[1])
+                high = self.max_value if fields[6] == "max" else min(int(fields[6]), self.max_value)
+                rows.append((int(fields[0]), modes, int(fields[2]), int(fields[3]), int(fields[4]), int(fields[5]), high, banner))
+        if not rows or self.max_level == 0:
+            raise ValueError(f"{filename}: no levels or no 'win' row")
+        rows.sort()
+
+        levels = []
+        banners = []
+        row_index = 0
+        for level in range(self.max_level + 1):
+            # Move on to the row that covers this level.
+            while row_index + 1 < len(rows) and rows[row_index + 1][0] <= level:
+                row_index += 1
+            first, modes, time, step, floor, low, high, banner = rows[row_index]
+            if time > 0:
+                time = max(floor, time - step * (level - first))
+            levels.append((modes, time, low, high))
+            banners.append(banner if level == first else None)
+        self.level_table = tuple(levels)
+        self.unlock_banners = tuple(banners)
+
+        self.difficulty_parse_us = utime.ticks_diff(utime.ticks_us(), start)
+        self.difficulty_bytes = free_before - gc.mem_free() if free_before else 0
+        print(f"Difficulty: {self.max_level} levels from {filename} in {self.difficulty_parse_us} us, {self.difficulty_bytes} bytes")
+
+    def _format_binary(self, n, width):
         binary_str = bin(n)[2:]
-        padding = '0' * (4 - len(binary_str))
+        padding = '0' * (width - len(binary_str))
         return padding + binary_str
 
+    def decimal_to_binary(self, n):
+        # Converts a decimal number into a binary string of bit_width digits with leading zeros.
+        if self.binary_strings is not None:
+            return self.binary_strings[n]
+        # Too wide for a full table, format it directly.
+        return self._format_binary(n, self.bit_width)
+
     def binary_to_decimal(self, b):
         # Converts a binary string into its decimal integer equivalent.
         return int(b, 2)
 
+    def task_text(self, task, mode):
+        # The "Task:" line of the HUD, or None when the display should draw the bits itself.
+        if self.task_texts is not None:
+            return self.task_texts[mode][task]
+        if mode == "CLASSIC":
+            return f"Task: {task}"
+        return None
+
+    def unlock_banner(self, level):
+        # The (title, line1, line2) screen to show on reaching a level, or None.
+        if level <= self.max_level:
+            return self.unlock_banners[level]
+        return None
+
     def generate_new_task(self, level):
         # Generates a new task, game mode, and time limit based on the player's current level.
-        # This function defines the game's difficulty progression.
-        
-        # First, select a random number between 3 and 15 for the task.
-        task = random.randint(3, 15)
-        # Initialize time limit to 0 (meaning no limit by default).
-        time = 0
-        
-        if level < 4:
-            # Levels 1-3: Only Classic mode (Decimal -> Binary).
-            mode = "CLASSIC"
-        elif level < 7:
-            # Levels 4-6: Only Reverse mode (Binary -> Decimal).
-            mode = "REVERSE"
-        elif level < 13:
-            # Levels 7-12: A mix of both modes to increase variety.
-            mode = random.choice(["CLASSIC", "REVERSE"])
-        else:
-            # Levels 13 and higher: Mix of modes with an added time limit for pressure.
-            mode = random.choice(["CLASSIC", "REVERSE"])
-            # The time limit starts at 15 seconds for level 13 and decreases
-            # by 1 second for each subsequent level, with a minimum of 5 seconds.
-            time = max(5, 15 - (level - 13))
+        # The difficulty progression itself comes from the level table.
+        modes, time, low, high = self.level_table[level if level <= self.max_level else self.max_level]
+        task = random.randint(low, high)
+        mode = modes[0] if len(modes) == 1 else random.choice(modes)
         
-        if mode == "REVERSE":
-            # For REVERSE mode, the task must be presented to the player as a binary string.
-            # The randomly generated decimal number is converted for this purpose.
-            task = self.decimal_to_binary(task)
-            
+        # The task stays an integer in both modes. In REVERSE mode the display shows it in binary.
         return task, mode, time
 
     def check_answer(self, state):
         # Validates the player's input against the correct answer based on the current game mode.
         if state.current_mode == "CLASSIC":
-            # In CLASSIC mode, compare the player's binary string input with the correct one.
-            correct_answer_str = self.decimal_to_binary(state.current_task)
-            return state.player_input_str == correct_answer_str
+            # In CLASSIC mode, the bits the player set must form the task number.
+            return state.player_input == state.current_task
         elif state.current_mode == "REVERSE":
-            # In REVERSE mode, compare the player's calculated sum with the correct decimal value.
-            correct_answer_dec = self.binary_to_decimal(state.current_task)
-            return state.player_sum == correct_answer_dec
+            # In REVERSE mode, compare the player's calculated sum with the task number.
+            return state.player_sum == state.current_task
         
         # Fallback, should not be reached in normal gameplay.
-        return False
\ No newline at end of file
+        return False
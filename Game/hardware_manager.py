@@ -1,6 +1,7 @@
 # hardware_manager.py
 # This module is responsible for controlling the hardware components
 # like LEDs, abstracting the low-level pin operations.
+# LED effects are described as timed patterns and played back without blocking the game loop.
 
 import machine
 import utime
@@ -13,18 +14,85 @@ class LEDs:
         # Sets up the GPIO pins for the green and red LEDs as outputs.
         self.green = machine.Pin(config.GREEN_LED_PIN, machine.Pin.OUT)
         self.red = machine.Pin(config.RED_LED_PIN, machine.Pin.OUT)
+        # One pattern slot per LED: [pin, steps, step_index, next_due_ms, repeat] or None.
+        # 'steps' is a tuple of (level, duration_ms) pairs.
+        self._leds = (self.green, self.red)
+        self._slots = [None, None]
+        # With a timer the patterns run on their own, otherwise main.py calls tick() every loop.
+        self._timer = None
+        if config.LED_TIMER_PERIOD_MS > 0:
+            self._timer = machine.Timer(period=config.LED_TIMER_PERIOD_MS, mode=machine.Timer.PERIODIC, callback=self._on_timer)
         print("Hardware Manager --> Ready")
 
+    def _start(self, led, steps, repeat=False):
+        # Replaces whatever pattern the LED was playing with a new one, starting right now.
+        slot = self._leds.index(led)
+        for level, duration in steps:
+            if duration <= 0:
+                # tick() advances until the next deadline is in the future, a step of 0 ms would
+                # never move it (a repeating pattern would then hang the loop). Clamp to 1 ms.
+                steps = tuple((level, duration if duration > 0 else 1) for level, duration in steps)
+                break
+        now = utime.ticks_ms()
+        led.value(steps[0][0])
+        self._slots[slot] = [led, steps, 0, utime.ticks_add(now, steps[0][1]), repeat]
+
+    def tick(self):
+        # Applies every on/off transition whose timestamp has passed.
+        now = utime.ticks_ms()
+        for slot in range(len(self._slots)):
+            pattern = self._slots[slot]
+            if pattern is None:
+                continue
+            led, steps, index, due, repeat = pattern
+            # A loop, so a late tick still catches up on several short steps.
+            while utime.ticks_diff(now, due) >= 0:
+                index += 1
+                if index >= len(steps):
+                    if not repeat:
+                        led.off()
+                        pattern = None
+                        break
+                    index = 0
+                led.value(steps[index][0])
+                # Next deadline is based on the previous one, so patterns don't drift.
+                due = utime.ticks_add(due, steps[index][1])
+            if pattern is None:
+                self._slots[slot] = None
+            else:
+                pattern[2] = index
+                pattern[3] = due
+
+    def _on_timer(self, timer):
+        self.tick()
+
+    def blink(self, led, times=3, on_ms=200, off_ms=200):
+        # Blinks one LED 'times' times.
+        self._start(led, ((1, on_ms), (0, off_ms)) * times)
+
+    def pulse(self, led, on_ms=50, period_ms=1000):
+        # Flashes the LED briefly once every period until stop() is called.
+        self._start(led, ((1, on_ms), (0, period_ms - on_ms)), repeat=True)
+
+    def one_shot(self, led, duration_ms):
+        # Turns the LED on once for the given time, e.g. as feedback for an answer.
+        self._start(led, ((1, duration_ms),))
+
+    def stop(self, led=None):
+        # Cancels the pattern on one LED (or on both) and turns it off.
+        for slot in range(len(self._leds)):
+            if led is None or self._leds[slot] is led:
+                self._slots[slot] = None
+                self._leds[slot].off()
+
+    def is_busy(self):
+        # True while any LED still has a pattern running.
+        return self._slots[0] is not None or self._slots[1] is not None
+
     def blink_all(self, times=3, delay=0.2):
         # Blinks both LEDs simultaneously for a specified number of times.
         # 'times': The number of blinks.
         # 'delay': The duration in seconds for the on and off states.
-        for _ in range(times):
-            # Turn both LEDs on.
-            self.green.on()
-            self.red.on()
-            utime.sleep(delay)
-            # Turn both LEDs off.
-            self.green.off()
-            self.red.off()
-            utime.sleep(delay)
\ No newline at end of file
+        delay_ms = int(delay * 1000)
+        self.blink(self.green, times, delay_ms, delay_ms)
+        self.blink(self.red, times, delay_ms, delay_ms)
@@ -0,0 +1,102 @@
+# heap_monitor.py
+# Decides when the garbage collector runs and keeps heap statistics per screen.
+#
+# MicroPython collects by itself whenever an allocation doesn't fit, which can happen in the
+# middle of a round and stall the countdown. Here gc.collect() is called once each time an idle
+# screen (config.GC_IDLE_SCREENS, e.g. the menu or the feedback screen) is entered, so the heap
+# is clean when a round starts. A collection the monitor did not run itself shows up as a drop
+# in the used heap between two samples and is counted as "unplanned".
+#
+# gc.mem_free()/gc.mem_alloc() walk the heap, so they are sampled on every screen change and
+# then only every config.HEAP_SAMPLE_TICKS ticks. On a PC (simulator) they don't exist and
+# the statistics stay at zero.
+
+import gc
+import utime
+import config
+import state_machine
+
+_has_mem_info = hasattr(gc, "mem_free") and hasattr(gc, "mem_alloc")
+
+# Screen names short enough for the debug screen, indexed by the screen ids of state_machine.py.
+SHORT_NAMES = ("menu", "game", "feed", "over", "win", "info", "dbg")
+
+
+class HeapMonitor:
+    # Call tick(screen) once per main loop tick, after the screen's update handler ran.
+
+    def __init__(self, idle_screens=config.GC_IDLE_SCREENS, sample_ticks=config.HEAP_SAMPLE_TICKS):
+        count = len(state_machine.NAMES)
+        self.idle = [state_machine.NAMES[screen] in idle_screens for screen in range(count)]
+        self.sample_ticks = sample_ticks
+        self.screen = -1
+        self._countdown = 0
+        self._last_used = 0
+        # Per screen statistics, -1 = not sampled yet.
+        self.free_min = [-1] * count
+        self.used_peak = [-1] * count
+        self.unplanned = [0] * count
+        # Collections run by the policy.
+        self.collections = 0
+        self.collect_us_last = 0
+        self.collect_us_max = 0
+
+    def collect(self):
+        start = utime.ticks_us()
+        gc.collect()
+        used = utime.ticks_diff(utime.ticks_us(), start)
+        self.collections += 1
+        self.collect_us_last = used
+        if used > self.collect_us_max:
+            self.collect_us_max = used
+        if _has_mem_info:
+            self._last_used = gc.mem_alloc()
+
+    def _sample(self, screen):
+        if not _has_mem_info:
+            return
+        free = gc.mem_free()
+        used = gc.mem_alloc()
+        if used < self._last_used:
+            # Memory was freed without collect() being called here.
+            self.unplanned[screen] += 1
+        self._last_used = used
+        if self.free_min[screen] < 0 or free < self.free_min[screen]:
+            self.free_min[screen] = free
+        if used > self.used_peak[screen]:
+            self.used_peak[screen] = used
+
+    def tick(self, screen):
+        if screen != self.screen:
+            # The screen before was left, record what it used, then clean up for the new one.
+            if self.screen >= 0:
+                self._sample(self.screen)
+            self.screen = screen
+            if self.idle[screen]:
+                self.collect()
+            self._sample(screen)
+            self._countdown = self.sample_ticks
+            return
+        self._countdown -= 1
+        if self._countdown <= 0:
+            self._countdown = self.sample_ticks
+            self._sample(screen)
+
+    def lines(self):
+        # Text lines of up to 15 characters for the debug screen on the OLED: the free heap,
+        # the policy's collections, then "screen peak-used unplanned" for every visited screen.
+        result = [f"free {gc.mem_free()}" if _has_mem_info else "no heap info",
+                  f"gc {self.collections} max {self.collect_us_max // 1000}ms"]
+        for screen in range(len(self.used_peak)):
+            if self.used_peak[screen] >= 0 and screen != state_machine.DEBUG:
+                result.append(f"{SHORT_NAMES[screen]} {self.used_peak[screen] // 1024}k {self.unplanned[screen]}")
+        return result
+
+    def report(self):
+        # Prints the per screen statistics to the serial console.
+        print(f"GC: {self.collections} collections on idle screens, last {self.collect_us_last} us, max {self.collect_us_max} us")
+        print("screen      free min  used peak  unplanned gc")
+        for screen in range(len(self.free_min)):
+            if self.used_peak[screen] < 0 and self.unplanned[screen] == 0:
+                continue
+            print(f"{state_machine.NAMES[screen]:10} {self.free_min[screen]:9} {self.used_peak[screen]:10} {self.unplanned[screen]:12}")
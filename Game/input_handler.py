@@ -1,11 +1,20 @@
 # input_handler.py
 # This module handles all physical button inputs.
-# It includes debouncing logic to ensure reliable press detection.
+# Button edges are captured by pin interrupts into a ring buffer, so presses made while the
+# game loop is busy (a display flush, for example) are not lost. Every button then runs its own
+# debounce state machine that turns edges into PRESS, RELEASE, HOLD and REPEAT events.
 
+import array
 import machine
 import utime
 import config
 
+# Event kinds returned by next_event().
+PRESS = 1
+RELEASE = 2
+HOLD = 3
+REPEAT = 4
+
 class InputHandler:
     # Manages button states and provides a clean way to check for presses.
 
@@ -14,32 +23,142 @@ class InputHandler:
         # A dictionary comprehension is used to create Pin objects for each button.
         # They are configured as inputs with an internal pull-up resistor.
         self.buttons = {name: machine.Pin(pin, machine.Pin.IN, machine.Pin.PULL_UP) for name, pin in config.BUTTON_PINS.items()}
+        # Button names by index, the ring buffer and the state arrays use the index instead of the name.
+        self.names = tuple(self.buttons)
+        self._pins = tuple(self.buttons[name] for name in self.names)
+        count = len(self.names)
+
+        # Edge ring buffer. Everything is allocated up front because the IRQ handler must not allocate.
+        # The IRQ handler only moves _head, _update() only moves _tail, so no locking is needed.
+        size = config.INPUT_EVENT_BUFFER_SIZE
+        self._ev_button = bytearray(size)
+        self._ev_level = bytearray(size)
+        self._ev_time = array.array("i", [0] * size)
+        self._size = size
+        self._head = 0
+        self._tail = 0
+        self.overflows = 0  # Edges dropped because the buffer was full.
+
+        # Timings per button as (debounce_ms, hold_ms, repeat_ms), see config.BUTTON_TIMINGS.
+        default = (config.BUTTON_DEBOUNCE_MS, config.BUTTON_HOLD_MS, config.BUTTON_REPEAT_MS)
+        self.timings = tuple(config.BUTTON_TIMINGS.get(name, default) for name in self.names)
+
+        # Debounce state per button. Buttons idle high because of the pull-up resistors.
+        self._stable = bytearray(b"\x01" * count)    # Debounced level.
+        self._raw = bytearray(b"\x01" * count)       # Last level seen on the pin.
+        self._raw_time = array.array("i", [0] * count)     # When the raw level last changed.
+        self._accept_time = array.array("i", [0] * count)  # When the debounced level last changed.
+        self._next_hold = array.array("i", [0] * count)    # When the next HOLD/REPEAT is due.
+        self._hold_state = bytearray(count)          # 0 = waiting for HOLD, 1 = repeating, 2 = done.
+
+        # Events ready for next_event(), as (kind, button_name).
+        self._events = []
+
+        self.use_irq = config.INPUT_USE_IRQ
+        if self.use_irq:
+            for index in range(count):
+                self._pins[index].irq(handler=self._make_handler(index), trigger=machine.Pin.IRQ_FALLING | machine.Pin.IRQ_RISING)
         print("Input Handler --> Ready")
-        
-        # Stores the timestamp of the last registered button press for debouncing.
-        self.last_press_time = 0
+
+    def _make_handler(self, index):
+        # Each pin gets its own small handler that knows the button index.
+        def handler(pin):
+            self._push(index, pin.value(), utime.ticks_ms())
+        return handler
+
+    def _push(self, index, level, timestamp):
+        # Stores one edge in the ring buffer (called from the IRQ handler).
+        head = self._head
+        next_head = head + 1
+        if next_head == self._size:
+            next_head = 0
+        if next_head == self._tail:
+            self.overflows += 1
+            return
+        self._ev_button[head] = index
+        self._ev_level[head] = level
+        self._ev_time[head] = timestamp
+        # Publish the event only after its data is written.
+        self._head = next_head
+
+    def pending_events(self):
+        # Number of edges waiting in the ring buffer.
+        return (self._head - self._tail) % self._size
+
+    def _edge(self, index, level, timestamp):
+        # Feeds one raw edge into the button's debounce state machine.
+        self._raw[index] = level
+        self._raw_time[index] = timestamp
+        if level == self._stable[index]:
+            return
+        # The first edge after a quiet period is accepted straight away, so a press is
+        # reported without waiting. Edges inside the debounce window are contact bounce.
+        if utime.ticks_diff(timestamp, self._accept_time[index]) >= self.timings[index][0]:
+            self._accept(index, level, timestamp)
+
+    def _accept(self, index, level, timestamp):
+        self._stable[index] = level
+        self._accept_time[index] = timestamp
+        if level == 0:
+            self._events.append((PRESS, self.names[index]))
+            self._hold_state[index] = 0
+            self._next_hold[index] = utime.ticks_add(timestamp, self.timings[index][1])
+        else:
+            self._events.append((RELEASE, self.names[index]))
+
+    def _update(self):
+        now = utime.ticks_ms()
+        if self.use_irq:
+            # Replay the recorded edges in order.
+            while self._tail != self._head:
+                tail = self._tail
+                self._edge(self._ev_button[tail], self._ev_level[tail], self._ev_time[tail])
+                self._tail = tail + 1 if tail + 1 < self._size else 0
+        else:
+            for index in range(len(self._pins)):
+                level = self._pins[index].value()
+                if level != self._raw[index]:
+                    self._edge(index, level, now)
+
+        for index in range(len(self._pins)):
+            debounce_ms, hold_ms, repeat_ms = self.timings[index]
+            stable = self._stable[index]
+            # A bounce can leave the pin at a different level than the one we accepted;
+            # once it has been steady for the debounce time, follow it.
+            if self._raw[index] != stable and utime.ticks_diff(now, self._raw_time[index]) >= debounce_ms:
+                self._accept(index, self._raw[index], self._raw_time[index])
+                stable = self._stable[index]
+            # HOLD once the button has been down for hold_ms, then REPEAT every repeat_ms.
+            if stable == 0 and self._hold_state[index] < 2 and hold_ms > 0:
+                if utime.ticks_diff(now, self._next_hold[index]) >= 0:
+                    name = self.names[index]
+                    if self._hold_state[index] == 0:
+                        self._events.append((HOLD, name))
+                    else:
+                        self._events.append((REPEAT, name))
+                    if repeat_ms > 0:
+                        self._hold_state[index] = 1
+                        self._next_hold[index] = utime.ticks_add(self._next_hold[index], repeat_ms)
+                    else:
+                        self._hold_state[index] = 2
+
+    def next_event(self):
+        # Returns the oldest input event as (kind, button_name), or None if nothing happened.
+        if not self._events:
+            self._update()
+            if not self._events:
+                return None
+        return self._events.pop(0)
 
     def check_press(self):
-        # Checks if any button has been pressed since the last check.
-        # This method includes a debounce delay to prevent multiple readings from a single press.
-        current_time = utime.ticks_ms()
-        
-        # If the time since the last press is less than the debounce delay, ignore any new press.
-        # This prevents electrical noise from registering as multiple rapid presses.
-        if utime.ticks_diff(current_time, self.last_press_time) < config.DEBOUNCE_DELAY_MS:
-            return None
-
-        # Iterate through all configured buttons.
-        for name, pin in self.buttons.items():
-            # With a pull-up resistor, the pin's value is 0 (LOW) when the button is pressed.
-            if pin.value() == 0:
-                # If a press is detected, update the last press time.
-                self.last_press_time = current_time
-                # And return the name of the pressed button (e.g., "CONFIRM").
-                return name
-                
-        # If no button is pressed, return None.
-        return None
+        # Returns the name of the next pressed button, or None.
+        # Only PRESS events are reported here, use next_event() to see the other kinds too.
+        while True:
+            event = self.next_event()
+            if event is None:
+                return None
+            if event[0] == PRESS:
+                return event[1]
 
     def is_button_held(self, button_name):
         # Checks if a specific button is being held down at this exact moment.
@@ -49,4 +168,4 @@ class InputHandler:
             # Return True if the button is pressed (pin value is 0), otherwise False.
             return pin.value() == 0
             
-        return False
\ No newline at end of file
+        return False
@@ -3,16 +3,25 @@
 # and manages the state machine.
 
 import utime
-# Explicit imports for better clarity
-import display_manager
-import audio_manager
-import hardware_manager # Needed for LEDs
-import input_handler
-import game_state as gs
-import game_logic as gl
-import config
-
-# Filename for storing the high score
+import boot_profiler
+
+# Every import below is timed by the boot profiler (the modules they import themselves included).
+profiler = boot_profiler.BootProfiler()
+config = profiler.load("config")
+display_manager = profiler.load("display_manager")
+input_handler = profiler.load("input_handler")
+gs = profiler.load("game_state")
+gl = profiler.load("game_logic")
+sm = profiler.load("state_machine")
+score_log = profiler.load("score_log")
+telemetry = profiler.load("telemetry")
+tracing = profiler.load("tracing")
+heap_monitor = profiler.load("heap_monitor")
+
+# Bit buttons and the bit (within the current bank) each one toggles
+BIT_BUTTONS = {"Bit 0": 0, "Bit 1": 1, "Bit 2": 2, "Bit 3": 3}
+
+# High score file of older versions, taken over into the score log once
 HIGHSCORE_FILENAME = "highscore.txt"
 
 print("--- Starting Main Program: Binary Breaker ---")
@@ -20,12 +29,20 @@ print("--- Starting Main Program: Binary Breaker ---")
 # --- Step 1: Initialize All Objects ---
 print("Initializing modules...")
 try:
-    display = display_manager.Display()
-    audio = audio_manager.AudioManager()
-    leds = hardware_manager.LEDs()
-    inputs = input_handler.InputHandler()
-    state = gs.GameState()
-    logic = gl.GameLogic()
+    display = profiler.create("Display", display_manager.Display)
+    if config.BOOT_LAZY_INIT:
+        # Not needed to show the menu, imported and created on first use.
+        profiler.lazy(globals(), "audio", "audio_manager", "AudioManager")
+        profiler.lazy(globals(), "leds", "hardware_manager", "LEDs")
+    else:
+        audio = profiler.create("AudioManager", profiler.load("audio_manager").AudioManager)
+        leds = profiler.create("LEDs", profiler.load("hardware_manager").LEDs)
+    inputs = profiler.create("InputHandler", input_handler.InputHandler)
+    state = profiler.create("GameState", gs.GameState)
+    logic = profiler.create("GameLogic", gl.GameLogic)
+    scores = profiler.create("ScoreLog", score_log.ScoreLog)
+    rounds = profiler.create("Telemetry", telemetry.Telemetry)
+    heap = profiler.create("HeapMonitor", heap_monitor.HeapMonitor)
     print("All modules initialized successfully.")
 except Exception as e:
     print(f"Error during initialization: {e}")
@@ -35,16 +52,20 @@ print("-" * 20)
 
 # --- New Functions for High Score ---
 def load_high_score():
-    """Loads the high score from a file."""
-    try:
-        with open(HIGHSCORE_FILENAME, "r") as f:
-            score = int(f.read())
-            state.high_score = score
-            print(f"High score loaded: {score}")
-    except (OSError, ValueError):
-        # If the file doesn't exist or is corrupted, start with zero.
-        state.high_score = 0
-        print("High score file not found, starting from 0.")
+    """Recovers the high score from the score log."""
+    if scores.load():
+        state.high_score = scores.score
+        print(f"High score loaded: {scores.score}")
+    else:
+        # No log yet. Take over the score of an older highscore.txt, if there is one.
+        try:
+            with open(HIGHSCORE_FILENAME, "r") as f:
+                state.high_score = int(f.read())
+            print(f"High score taken over from {HIGHSCORE_FILENAME}: {state.high_score}")
+        except (OSError, ValueError):
+            state.high_score = 0
+            print("High score file not found, starting from 0.")
+    scores.report()
 
 def save_high_score():
     """Checks and saves the new high score."""
@@ -54,8 +75,8 @@ def save_high_score():
         state.high_score = state.score
         is_new_record = True # A new record was set!
         try:
-            with open(HIGHSCORE_FILENAME, "w") as f:
-                f.write(str(state.high_score))
+            # Appends a record to the log instead of rewriting a file in place.
+            scores.append(state.high_score)
         except OSError as e:
             print(f"Error saving high score: {e}")
     return is_new_record # Return the result
@@ -64,181 +85,278 @@ def save_high_score():
 load_high_score()
 
 # --- Step 2: Helper Functions for Game Control ---
-def run_startup_sequence():
+def start_new_game():
+    """Starts a brand new game from level 1."""
+    print("Starting new game...")
+    current_high_score = state.high_score
+    state.reset()
+    state.high_score = current_high_score
+    rounds.new_game()
+    screens.go(sm.GAME)
+
+def show_feedback(outcome, points, message=""):
+    """Applies the score change of an answer, logs the round and switches to the feedback screen."""
+    is_correct = outcome == telemetry.CORRECT
+    state.score = max(0, state.score + points)
+    # Logged before the feedback screen is drawn, so its render and flush don't count as answer time.
+    rounds.record(state.level, state.current_mode, state.current_task, outcome, state.score)
+    state.last_feedback_correct = is_correct
+    state.feedback_points = points
+    state.feedback_message = message
+    screens.go(sm.FEEDBACK)
+
+def skip_level_cheat():
+    """DEV CHEAT: holding Cancel (see config.BUTTON_TIMINGS) skips three levels."""
+    print("CHEAT ACTIVATED: Skipping level...")
+    if state.level >= logic.max_level - 2: new_level = logic.max_level
+    else: new_level = state.level + 3
+    state.level = min(logic.max_level, new_level)
+    audio.play_confirm()
+    leds.blink_all(times=1, delay=0.1)
+    if screens.current == sm.GAME or screens.current == sm.FEEDBACK:
+        screens.go(sm.GAME)
+
+def poll_input():
+    """Handles one input event and returns the name of the pressed button, or None."""
+    event = inputs.next_event()
+    if event is None:
+        return None
+    kind, name = event
+    if kind == input_handler.HOLD and name == "Cancel":
+        skip_level_cheat()
+    elif kind == input_handler.HOLD and name == "Bit 0" and screens.current == sm.MENU:
+        screens.go(sm.DEBUG) # Heap statistics on the OLED
+    elif kind == input_handler.PRESS or kind == input_handler.REPEAT:
+        return name
+    return None
+
+# --- Step 3: The Screens (State Machine) ---
+# Every screen draws itself once in its enter handler. The update handlers run every tick
+# and only redraw when something on the screen actually changed.
+
+# --- A. MENU SCREEN ---
+def enter_menu():
     """Runs the startup sequence at the start or restart of the game."""
+    global menu_effects_due
     print("Running startup sequence...")
     current_high_score = state.high_score # We remember the high score
     state.reset()
     state.high_score = current_high_score # Restore it after the reset
     display.draw_main_menu()
-    audio.play_startup()
-    leds.blink_all(times=3, delay=0.1)
+    # The jingle and blink start on the first menu tick, so at power-on the (lazy) audio and
+    # LEDs are created after the menu is already responsive.
+    menu_effects_due = True
+    rounds.flush() # Idle screen, a good moment for the flash write
     print("Startup sequence complete. Waiting for player.")
 
-def start_new_game():
-    """Starts a brand new game from level 1."""
-    print("Starting new game...")
-    current_high_score = state.high_score
-    state.reset()
-    state.high_score = current_high_score
-    start_new_level()
+def update_menu(pressed_button):
+    global menu_effects_due
+    if menu_effects_due:
+        menu_effects_due = False
+        audio.play_startup()
+        leds.blink_all(times=3, delay=0.1)
+    if pressed_button == "Confirm":
+        audio.play_confirm()
+        start_new_game()
+
+menu_effects_due = False
 
-def start_new_level():
+# --- B. GAME SCREEN ---
+def enter_game():
     """Prepares and displays a new game round."""
+    if state.level > logic.max_level:
+        screens.go(sm.WIN)
+        return
     print(f"Preparing Level {state.level}...")
-    state.current_screen = "GAME"
-    state.player_input_str = "0000"
-    state.player_sum = 0
+    state.reset_input()
     
     task, mode, time = logic.generate_new_task(state.level)
     
     state.current_task = task
     state.current_mode = mode
+    state.task_text = logic.task_text(task, mode)
     state.time_left = time
+    state.time_shown = time
     
     if time > 0:
         state.timer_start_time = utime.ticks_ms()
         
     display.draw_game_hud(state)
+    rounds.start_round()
     print(f"Task: {mode} {task}")
 
-# --- Step 3: Program Start ---
-run_startup_sequence()
-
-
-# --- Step 4: The Main Infinite Loop (The Heart of the Program) ---
-cancel_hold_start_time = 0
-long_press_cheat_active = False
-CHEAT_HOLD_DURATION_MS = 3000
-
-while True:
-    # --- DEV CHEAT: Skip Level ---
-    current_time_for_cheat = utime.ticks_ms()
-    if inputs.is_button_held("Cancel"):
-        if cancel_hold_start_time == 0:
-            cancel_hold_start_time = current_time_for_cheat
-        else:
-            hold_duration = utime.ticks_diff(current_time_for_cheat, cancel_hold_start_time)
-            if hold_duration > CHEAT_HOLD_DURATION_MS and not long_press_cheat_active:
-                print("CHEAT ACTIVATED: Skipping level...")
-                long_press_cheat_active = True
-                if state.level >= 18: new_level = 20
-                else: new_level = state.level + 3
-                state.level = min(20, new_level)
-                audio.play_confirm()
-                leds.blink_all(times=1, delay=0.1)
-                if state.current_screen in ["GAME", "FEEDBACK"]:
-                    start_new_level()
-    else:
-        cancel_hold_start_time = 0
-        long_press_cheat_active = False
-
-    pressed_button = inputs.check_press()
+def update_game(pressed_button):
+    changed = False
+    if state.time_left > 0:
+        elapsed_seconds = utime.ticks_diff(utime.ticks_ms(), state.timer_start_time) // 1000
+        remaining = state.time_left - elapsed_seconds
+        if remaining <= 0:
+            show_feedback(telemetry.TIMEOUT, -5, "TIME'S UP")
+            return
+        if remaining != state.time_shown:
+            # The countdown on the HUD moved on by a second.
+            state.time_shown = remaining
+            changed = True
     
-    # --- Process logic based on the active screen (State Machine) ---
-    
-    # --- A. GAME SCREEN LOGIC ---
-    if state.current_screen == "GAME":
-        if state.level > 20:
-            state.current_screen = "WIN"
-            audio.play_startup()
-            is_new_record = save_high_score() # Check for a new record and save it
-            display.draw_win_screen(state.score, state.high_score, is_new_record) # Pass the result to the screen
-            continue
-
-        if state.time_left > 0:
-            elapsed_seconds = utime.ticks_diff(utime.ticks_ms(), state.timer_start_time) // 1000
-            if elapsed_seconds > 0 and pressed_button:
-                display.draw_game_hud(state)
-            
-            if state.time_left - elapsed_seconds <= 0:
-                audio.play_error()
-                leds.red.on()
-                state.score = max(0, state.score - 5)
-                state.last_feedback_correct = False
-                display.draw_feedback_screen(False, -5, "TIME'S UP")
-                state.current_screen = "FEEDBACK"
-                state.feedback_start_time = utime.ticks_ms()
-                continue
-        
-        if pressed_button:
-            audio.play_press()
-            if "Bit" in pressed_button:
-                bit_index = int(pressed_button.split(' ')[1])
-                if state.current_mode == "CLASSIC": state.toggle_player_input_bit(bit_index)
-                else: state.player_sum += logic.bit_values[bit_index]
-            elif pressed_button == "Cancel":
-                audio.play_reset()
-                if state.current_mode == "CLASSIC": state.player_input_str = "0000"
-                else: state.player_sum = 0
-            elif pressed_button == "Confirm":
-                is_correct = logic.check_answer(state)
-                state.last_feedback_correct = is_correct
-                if is_correct:
-                    state.score += 10
-                    audio.play_confirm()
-                    leds.green.on()
-                    display.draw_feedback_screen(True, 10)
-                else:
-                    state.score = max(0, state.score - 5)
-                    audio.play_error()
-                    leds.red.on()
-                    display.draw_feedback_screen(False, -5)
-                state.current_screen = "FEEDBACK"
-                state.feedback_start_time = utime.ticks_ms()
-
-            if state.current_screen == "GAME":
-                display.draw_game_hud(state)
-
-    # --- B. MENU SCREEN LOGIC ---
-    elif state.current_screen == "MENU":
-        if pressed_button == "Confirm":
-            audio.play_confirm()
-            start_new_game()
-            
-    # --- C. FEEDBACK SCREEN LOGIC ---
-    elif state.current_screen == "FEEDBACK":
-        if utime.ticks_diff(utime.ticks_ms(), state.feedback_start_time) > config.FEEDBACK_DURATION_MS:
-            leds.green.off()
-            leds.red.off()
-
-            show_info_screen = False
-            if state.last_feedback_correct:
-                state.level += 1
-                # Check if the new level unlocks a feature
-                if state.level == 4:
-                    display.draw_info_screen("NEW MODE", "Unlocked:", "REVERSE Mode")
-                    show_info_screen = True
-                elif state.level == 7:
-                    display.draw_info_screen("NEW MODE", "Unlocked:", "MIXED Modes")
-                    show_info_screen = True
-                elif state.level == 13:
-                    display.draw_info_screen("CHALLENGE!", "Added:", "TIME LIMIT!")
-                    show_info_screen = True
-            
-            if show_info_screen:
-                state.current_screen = "INFO" # Switch to the new screen
+    if pressed_button:
+        audio.play_press()
+        if pressed_button in BIT_BUTTONS:
+            # The four bit buttons edit the current bank of four bits.
+            bit_index = (state.input_bank << 2) + BIT_BUTTONS[pressed_button]
+            if state.current_mode == "CLASSIC": state.toggle_player_input_bit(bit_index)
+            else: state.player_sum += logic.bit_values[bit_index]
+        elif pressed_button == "Cancel":
+            audio.play_reset()
+            state.reset_input()
+        elif pressed_button == "Confirm" and state.input_bank > 0:
+            # With more than 4 bits, Confirm first steps down to the next bank.
+            state.input_bank -= 1
+        elif pressed_button == "Confirm":
+            if logic.check_answer(state):
+                show_feedback(telemetry.CORRECT, 10)
             else:
-                # If there's nothing to unlock, continue normally
-                if state.last_feedback_correct == False:
-                    start_new_level()
-                else:
-                    start_new_level()
-            
-    # --- D. GAME OVER SCREEN LOGIC ---
-    elif state.current_screen == "GAME_OVER":
-        if pressed_button == "Confirm":
-            run_startup_sequence()
-
-    # --- E. WIN SCREEN LOGIC ---
-    elif state.current_screen == "WIN":
-        if pressed_button == "Confirm":
-            run_startup_sequence()
-
-    # --- F. INFO SCREEN LOGIC ---
-    elif state.current_screen == "INFO":
-        if pressed_button == "Confirm":
-            audio.play_confirm()
-            start_new_level() # After confirmation, start the new level
-
-    utime.sleep(0.01)
+                show_feedback(telemetry.WRONG, -5)
+            return
+        changed = True
+
+    if changed:
+        display.draw_game_hud(state)
+
+# --- C. FEEDBACK SCREEN ---
+def enter_feedback():
+    if state.last_feedback_correct:
+        audio.play_confirm()
+        leds.one_shot(leds.green, config.FEEDBACK_DURATION_MS)
+    else:
+        audio.play_error()
+        leds.one_shot(leds.red, config.FEEDBACK_DURATION_MS)
+    display.draw_feedback_screen(state.last_feedback_correct, state.feedback_points, state.feedback_message)
+    state.feedback_start_time = utime.ticks_ms()
+    if rounds.half_full():
+        rounds.flush() # Long games would fill the buffer before the next menu or win screen
+
+def update_feedback(pressed_button):
+    if utime.ticks_diff(utime.ticks_ms(), state.feedback_start_time) > config.FEEDBACK_DURATION_MS:
+        if state.last_feedback_correct:
+            state.level += 1
+            # The difficulty table says whether the new level unlocks a feature
+            if logic.unlock_banner(state.level) is not None:
+                screens.go(sm.INFO)
+                return
+        # If there's nothing to unlock, continue normally
+        screens.go(sm.GAME)
+
+# --- D. GAME OVER SCREEN ---
+def enter_game_over():
+    display.draw_game_over_screen(state.score)
+    rounds.flush()
+
+def update_back_to_menu(pressed_button):
+    if pressed_button == "Confirm":
+        screens.go(sm.MENU)
+
+# --- E. WIN SCREEN ---
+def enter_win():
+    audio.play_startup()
+    is_new_record = save_high_score() # Check for a new record and save it
+    display.draw_win_screen(state.score, state.high_score, is_new_record) # Pass the result to the screen
+    rounds.flush()
+
+# --- F. INFO SCREEN ---
+def enter_info():
+    title, line1, line2 = logic.unlock_banner(state.level)
+    display.draw_info_screen(title, line1, line2)
+
+def update_info(pressed_button):
+    if pressed_button == "Confirm":
+        audio.play_confirm()
+        screens.go(sm.GAME) # After confirmation, start the new level
+
+# --- G. DEBUG SCREEN (hold Bit 0 in the menu) ---
+def enter_debug():
+    display.draw_debug_screen(heap.lines())
+
+def update_debug(pressed_button):
+    if pressed_button == "Confirm":
+        screens.go(sm.MENU)
+    elif pressed_button:
+        enter_debug() # Any other button refreshes the numbers
+
+def game_tick(pressed_button):
+    """One tick of the active screen, then the GC policy (collects only on idle screens)."""
+    screens.tick(pressed_button)
+    heap.tick(screens.current)
+
+screens = sm.StateMachine(state, lambda: display.frames)
+screens.register(sm.MENU, enter_menu, update_menu)
+screens.register(sm.GAME, enter_game, update_game)
+screens.register(sm.FEEDBACK, enter_feedback, update_feedback)
+screens.register(sm.GAME_OVER, enter_game_over, update_back_to_menu)
+screens.register(sm.WIN, enter_win, update_back_to_menu)
+screens.register(sm.INFO, enter_info, update_info)
+screens.register(sm.DEBUG, enter_debug, update_debug)
+
+# --- Step 4: Program Start ---
+# The menu is drawn here, the startup jingle and blink follow on the first loop tick.
+screens.go(sm.MENU)
+if config.BOOT_PROFILE:
+    profiler.report(config.BOOT_TARGET_MS)
+
+
+# --- Step 5: The Main Loop ---
+if config.USE_ASYNC_RUNTIME:
+    # Input, game logic, display, audio and LEDs run as separate cooperative tasks.
+    import async_runtime
+    async_runtime.run(game_tick, poll_input, display, audio, leds, config.ASYNC_RUN_DURATION_MS)
+else:
+    # Each tick sleeps only for what is left of its budget, idle screens tick slower.
+    scheduler = profiler.create("TickScheduler", profiler.load("tick_scheduler").TickScheduler)
+    # Optionally the display transfers and the tone sequencer move to the second core.
+    worker = None
+    if config.DUAL_CORE:
+        core1_worker = profiler.load("core1_worker")
+        audio.is_busy() # Creates a lazy AudioManager now, core 1 needs the real object
+        worker = core1_worker.Core1Worker(display, audio)
+        worker.start()
+    elif config.DISPLAY_FLUSH_PAGES_PER_TICK > 0:
+        # Frames are only rendered in the tick and sent a few pages per tick, so a full screen
+        # change never holds up input handling for the whole transfer.
+        display.deferred = True
+    trace_chord_held = False
+    while True:
+        # Advance the non-blocking tone sequencer and LED patterns.
+        if worker is None:
+            t0 = tracing.begin()
+            audio.tick()
+            tracing.end(tracing.SPAN_AUDIO, t0)
+        t0 = tracing.begin()
+        leds.tick()
+        tracing.end(tracing.SPAN_LEDS, t0)
+
+        t0 = tracing.begin()
+        pressed_button = poll_input()
+        tracing.end(tracing.SPAN_INPUT, t0)
+
+        # Holding Confirm + Cancel together prints the trace summary on the serial console.
+        if tracing.enabled:
+            chord = inputs.is_button_held("Confirm") and inputs.is_button_held("Cancel")
+            if chord and not trace_chord_held:
+                tracing.dump()
+                screens.report()
+                heap.report()
+                rounds.report()
+                scheduler.report()
+                if worker is not None:
+                    worker.report()
+            trace_chord_held = chord
+
+        screen_span = tracing.SCREEN_SPANS[state.current_screen]
+        t0 = tracing.begin()
+        game_tick(pressed_button)
+        tracing.end(screen_span, t0)
+        if worker is not None:
+            worker.submit_frame() # Core 1 sends the frame while the next tick runs
+        elif display.flush_pending:
+            display.flush_step()
+        # The slow idle tick waits until the frame, sound and LED patterns have finished.
+        scheduler.wait(state.current_screen, not (display.flush_pending or audio.is_busy() or leds.is_busy()))
@@ -0,0 +1,120 @@
+# score_log.py
+# Crash-safe, wear-levelled storage for the high score.
+#
+# Instead of rewriting one small file in place on every new record, the scores are appended
+# as fixed-size, checksummed records to a file that is created once at full size. Every save
+# fills the next free slot, so the same flash area is not rewritten again and again. When all
+# slots are used, the log is compacted: a fresh file holding only the newest record is written
+# under a temporary name and renamed over the old one, so a power cut at any point leaves either
+# the old or the new log. A record torn by a power cut fails its checksum and is skipped.
+#
+# Record layout (16 bytes, little endian):
+#     magic (B), unused (B), generation (H), sequence (I), score (I), crc32 of the first 12 bytes (I)
+# 'generation' counts the compactions and 'sequence' the saves, so the estimated number of flash
+# erases survives reboots.
+
+import binascii
+import os
+import struct
+import config
+
+RECORD_SIZE = 16
+_HEAD = "<BBHII"
+_MAGIC = 0xB5
+_ERASED = 0xFF  # erased flash reads as 0xFF
+
+
+class ScoreLog:
+    # Keeps the newest valid score and where the next record goes.
+
+    def __init__(self, filename=config.HIGHSCORE_LOG_FILE, slots=config.HIGHSCORE_LOG_SLOTS):
+        self.filename = filename
+        self.slots = slots
+        self.score = 0
+        self.sequence = 0
+        self.generation = 0
+        self.next_slot = slots  # no usable log until load() finds one
+        # Statistics.
+        self.bad_records = 0
+        self.records_written = 0
+        self.compactions = 0
+        # Flash blocks the log file occupies, each compaction erases them once.
+        self.blocks = (slots * RECORD_SIZE + config.FLASH_ERASE_BLOCK - 1) // config.FLASH_ERASE_BLOCK
+
+    def _record(self, score):
+        head = struct.pack(_HEAD, _MAGIC, 0, self.generation, self.sequence, score)
+        return head + struct.pack("<I", binascii.crc32(head) & 0xFFFFFFFF)
+
+    def load(self):
+        # Recovers the newest valid record with one sequential read of the whole log.
+        # Returns True when one was found.
+        try:
+            with open(self.filename, "rb") as f:
+                data = f.read()
+        except OSError:
+            return False
+        view = memoryview(data)
+        found = False
+        used = 0
+        for slot in range(min(self.slots, len(data) // RECORD_SIZE)):
+            offset = slot * RECORD_SIZE
+            if data[offset] == _ERASED:
+                continue
+            used = slot + 1
+            magic, _, generation, sequence, score = struct.unpack_from(_HEAD, data, offset)
+            crc = struct.unpack_from("<I", data, offset + 12)[0]
+            if magic != _MAGIC or binascii.crc32(view[offset:offset + 12]) & 0xFFFFFFFF != crc:
+                # Torn or damaged record, the one before it is still valid.
+                self.bad_records += 1
+                continue
+            if not found or sequence > self.sequence:
+                found = True
+                self.score = score
+                self.sequence = sequence
+                self.generation = generation
+        # Only a log of the right size can be appended to, otherwise the next save compacts it.
+        self.next_slot = used if len(data) == self.slots * RECORD_SIZE else self.slots
+        return found
+
+    def append(self, score):
+        # Stores a new score in the next free slot, or compacts the log when it is full.
+        self.sequence += 1
+        if self.next_slot >= self.slots:
+            self._compact(score)
+        else:
+            with open(self.filename, "r+b") as f:
+                f.seek(self.next_slot * RECORD_SIZE)
+                f.write(self._record(score))
+            self.next_slot += 1
+        self.score = score
+        self.records_written += 1
+
+    def _compact(self, score):
+        # Writes a new log with the score in slot 0 and renames it over the old one.
+        self.generation = (self.generation + 1) & 0xFFFF
+        temp = self.filename + ".tmp"
+        with open(temp, "wb") as f:
+            f.write(self._record(score))
+            empty = bytes([_ERASED]) * RECORD_SIZE
+            for _ in range(self.slots - 1):
+                f.write(empty)
+        os.rename(temp, self.filename)
+        self.next_slot = 1
+        self.compactions += 1
+
+    def erase_count(self):
+        # Estimated flash block erases caused by the log since it was created. On LittleFS every
+        # write into a slot is copy-on-write and costs at least one block erase, and each
+        # compaction rewrites all blocks of the log.
+        return self.sequence + self.generation * self.blocks
+
+    def report(self):
+        # Prints the state of the log and a lifetime estimate to the serial console. The estimate
+        # is the worst case, as if every erase hit the same block; LittleFS spreads them over all
+        # free blocks of the filesystem, so the real lifetime is a multiple of it.
+        erases = self.erase_count()
+        wear = erases * 100 / config.FLASH_ENDURANCE_CYCLES
+        erases_per_save = 1 + self.blocks / self.slots
+        print(f"Score log: record {self.sequence}, slot {self.next_slot}/{self.slots}, {self.bad_records} bad records")
+        print(f"Score log: {erases} block erases ({self.compactions} compactions this session), {wear:.3f}% of one block's endurance")
+        print(f"Score log: at least {int(config.FLASH_ENDURANCE_CYCLES / erases_per_save)} saves until wear-out (1 erase per save, all on one block)")
@@ -0,0 +1,54 @@
+# screen_cache.py
+# This module keeps fully rendered frame buffers of screens that never change,
+# so showing them again is a single buffer copy instead of redrawing every line of text.
+
+import config
+
+class ScreenCache:
+    # A small LRU cache of 1 KB frames keyed by the screen name and its arguments.
+
+    def __init__(self, frame_size, max_bytes=config.SCREEN_CACHE_MAX_BYTES):
+        self.frame_size = frame_size
+        # The memory cap is turned into a frame count, so the cache never grows past it.
+        self.max_frames = max_bytes // frame_size
+        self._frames = {}
+        self._order = []  # Keys from least to most recently used.
+        self.hits = 0
+        self.misses = 0
+
+    def restore(self, key, buffer):
+        # Copies a cached frame into the given buffer. Returns False on a cache miss.
+        frame = self._frames.get(key)
+        if frame is None:
+            self.misses += 1
+            return False
+        memoryview(buffer)[:] = frame
+        # Move the key to the "most recently used" end.
+        self._order.remove(key)
+        self._order.append(key)
+        self.hits += 1
+        return True
+
+    def store(self, key, buffer):
+        # Saves a copy of the rendered buffer under the given key.
+        if self.max_frames == 0:
+            return
+        frame = self._frames.get(key)
+        if frame is None:
+            if len(self._order) >= self.max_frames:
+                # Evict the least recently used screen and reuse its buffer.
+                evicted = self._order.pop(0)
+                frame = self._frames.pop(evicted)
+            else:
+                frame = bytearray(self.frame_size)
+            self._frames[key] = frame
+            self._order.append(key)
+        memoryview(frame)[:] = buffer
+
+    def memory_used(self):
+        # Number of bytes currently held by cached frames.
+        return len(self._frames) * self.frame_size
+
+    def clear(self):
+        self._frames = {}
+        self._order = []
@@ -23,6 +23,10 @@ SET_PRECHARGE = const(0xD9)
 SET_VCOM_DESEL = const(0xDB)
 SET_CHARGE_PUMP = const(0x8D)
 
+# Bus bytes a partial window costs on top of its columns: the 6 window commands, two control
+# bytes and two address bytes.
+_WINDOW_OVERHEAD = const(10)
+
 # Subclassing FrameBuffer provides support for graphics primitives
 # http://docs.micropython.org/en/latest/pyboard/library/framebuf.html
 class SSD1306(framebuf.FrameBuffer):
@@ -32,11 +36,133 @@ class SSD1306(framebuf.FrameBuffer):
         self.external_vcc = external_vcc
         self.pages = self.height // 8
         self.buffer = bytearray(self.pages * self.width)
+        self._view = memoryview(self.buffer)
+        # Partial flush: when enabled, show() only sends the column range of
+        # each page that was drawn to since the last push.
+        self.partial = False
+        # Per-page dirty column range, a page is clean when x0 > x1.
+        self._dirty_x0 = bytearray(self.pages)
+        self._dirty_x1 = bytearray(self.pages)
+        # Reused command buffers, so show() and contrast() don't allocate.
+        self._window_cmds = bytearray(6)
+        self._window_cmds[0] = SET_COL_ADDR
+        self._window_cmds[3] = SET_PAGE_ADDR
+        self._contrast_cmds = bytearray(2)
+        self._contrast_cmds[0] = SET_CONTRAST
+        self._clear_dirty()
+        self.reset_counters()
         super().__init__(self.buffer, self.width, self.height, framebuf.MONO_VLSB)
         self.init_display()
 
+    def reset_counters(self):
+        # bytes_sent counts everything put on the bus (commands, control bytes and data),
+        # data_bytes_sent only the GDDRAM payload pushed by show(), transactions the bus transfers.
+        self.bytes_sent = 0
+        self.transactions = 0
+        self.data_bytes_sent = 0
+        self.flush_count = 0
+
+    def _clear_dirty(self):
+        for page in range(self.pages):
+            self._dirty_x0[page] = 0xFF
+            self._dirty_x1[page] = 0
+
+    def mark_dirty(self, x, y, w, h):
+        # Marks a rectangle as changed so the next partial show() sends it.
+        # Call this after writing to self.buffer directly.
+        x0 = x if x > 0 else 0
+        y0 = y if y > 0 else 0
+        x1 = x + w - 1
+        y1 = y + h - 1
+        if x1 >= self.width:
+            x1 = self.width - 1
+        if y1 >= self.height:
+            y1 = self.height - 1
+        if x0 > x1 or y0 > y1:
+            return
+        for page in range(y0 >> 3, (y1 >> 3) + 1):
+            if x0 < self._dirty_x0[page]:
+                self._dirty_x0[page] = x0
+            if x1 > self._dirty_x1[page]:
+                self._dirty_x1[page] = x1
+
+    def dirty_span(self, page):
+        # Returns the (x0, x1) dirty column range of a page, x0 > x1 when clean.
+        return self._dirty_x0[page], self._dirty_x1[page]
+
+    def set_dirty_span(self, page, x0, x1):
+        # Replaces the dirty range of a page, pass x0 > x1 to mark it clean.
+        if x0 > x1:
+            x0, x1 = 0xFF, 0
+        self._dirty_x0[page] = x0
+        self._dirty_x1[page] = x1
+
+    def is_dirty(self):
+        for page in range(self.pages):
+            if self._dirty_x0[page] <= self._dirty_x1[page]:
+                return True
+        return False
+
+    # Drawing primitives are wrapped so every change records its bounding box.
+    def fill(self, c):
+        super().fill(c)
+        self.mark_dirty(0, 0, self.width, self.height)
+
+    def pixel(self, x, y, *c):
+        if not c:
+            return super().pixel(x, y)
+        super().pixel(x, y, c[0])
+        self.mark_dirty(x, y, 1, 1)
+
+    def hline(self, x, y, w, c):
+        super().hline(x, y, w, c)
+        self.mark_dirty(x, y, w, 1)
+
+    def vline(self, x, y, h, c):
+        super().vline(x, y, h, c)
+        self.mark_dirty(x, y, 1, h)
+
+    def line(self, x1, y1, x2, y2, c):
+        super().line(x1, y1, x2, y2, c)
+        self.mark_dirty(min(x1, x2), min(y1, y2), abs(x2 - x1) + 1, abs(y2 - y1) + 1)
+
+    def rect(self, x, y, w, h, c, *f):
+        super().rect(x, y, w, h, c, *f)
+        self.mark_dirty(x, y, w, h)
+
+    def fill_rect(self, x, y, w, h, c):
+        super().fill_rect(x, y, w, h, c)
+        self.mark_dirty(x, y, w, h)
+
+    def text(self, s, x, y, *c):
+        super().text(s, x, y, *c)
+        self.mark_dirty(x, y, len(s) * 8, 8)
+
+    def scroll(self, xstep, ystep):
+        super().scroll(xstep, ystep)
+        self.mark_dirty(0, 0, self.width, self.height)
+
+    def blit(self, fbuf, x, y, *args):
+        # The source size is not known here, so the whole screen is marked.
+        super().blit(fbuf, x, y, *args)
+        self.mark_dirty(0, 0, self.width, self.height)
+
+    def blit_area(self, fbuf, x, y, w, h, key=-1):
+        # blit() for a source of known size, so only the covered area is marked.
+        super().blit(fbuf, x, y, key)
+        self.mark_dirty(x, y, w, h)
+
+    # Unmarked drawing with a fixed argument list (no *args tuple per call), for callers that
+    # mark the area themselves (text_cache.py draws one glyph at a time).
+    def text_unmarked(self, s, x, y, c):
+        super().text(s, x, y, c)
+
+    def blit_unmarked(self, fbuf, x, y, key):
+        super().blit(fbuf, x, y, key)
+
     def init_display(self):
-        for cmd in (
+        # The whole sequence goes out as one command transaction.
+        self.write_cmds(bytes((
             SET_DISP | 0x00,  # off
             # address setting
             SET_MEM_ADDR,
@@ -66,9 +192,8 @@ class SSD1306(framebuf.FrameBuffer):
             # charge pump
             SET_CHARGE_PUMP,
             0x10 if self.external_vcc else 0x14,
-            SET_DISP | 0x01,
-        ):  # on
-            self.write_cmd(cmd)
+            SET_DISP | 0x01,  # on
+        )))
         self.fill(0)
         self.show()
 
@@ -79,26 +204,81 @@ class SSD1306(framebuf.FrameBuffer):
         self.write_cmd(SET_DISP | 0x01)
 
     def contrast(self, contrast):
-        self.write_cmd(SET_CONTRAST)
-        self.write_cmd(contrast)
+        self._contrast_cmds[1] = contrast
+        self.write_cmds(self._contrast_cmds)
 
     def invert(self, invert):
         self.write_cmd(SET_NORM_INV | (invert & 1))
 
-    def show(self):
-        x0 = 0
-        x1 = self.width - 1
+    def _set_window(self, x0, x1, page0, page1):
         if self.width == 64:
             # displays with width of 64 pixels are shifted by 32
             x0 += 32
             x1 += 32
-        self.write_cmd(SET_COL_ADDR)
-        self.write_cmd(x0)
-        self.write_cmd(x1)
-        self.write_cmd(SET_PAGE_ADDR)
-        self.write_cmd(0)
-        self.write_cmd(self.pages - 1)
-        self.write_data(self.buffer)
+        cmds = self._window_cmds
+        cmds[1] = x0
+        cmds[2] = x1
+        cmds[4] = page0
+        cmds[5] = page1
+        self.write_cmds(cmds)
+
+    def show(self):
+        if self.partial and self._windows_cost() < len(self.buffer) + _WINDOW_OVERHEAD:
+            self.show_from(self._view, self._dirty_x0, self._dirty_x1)
+        else:
+            # Nothing to save: after fill(0) every page is dirty over its full width, and eight
+            # windows cost more than one transfer of the whole frame.
+            self.show_from(self._view)
+        self._clear_dirty()
+
+    def _windows_cost(self):
+        # Bus bytes a partial show() would send.
+        cost = 0
+        for page in range(self.pages):
+            x0 = self._dirty_x0[page]
+            x1 = self._dirty_x1[page]
+            if x0 <= x1:
+                cost += x1 - x0 + 1 + _WINDOW_OVERHEAD
+        return cost
+
+    def show_page(self, page):
+        # Sends one page, its dirty columns or all of it when partial is off, and marks it clean.
+        # Lets a caller spread a frame over several calls (see Display.flush_step).
+        if self.partial:
+            x0 = self._dirty_x0[page]
+            x1 = self._dirty_x1[page]
+            if x0 > x1:
+                return
+        else:
+            x0 = 0
+            x1 = self.width - 1
+        self._set_window(x0, x1, page, page)
+        start = page * self.width
+        self.write_data(self._view[start + x0 : start + x1 + 1])
+        self.data_bytes_sent += x1 - x0 + 1
+        self._dirty_x0[page] = 0xFF
+        self._dirty_x1[page] = 0
+
+    def show_from(self, view, dirty_x0=None, dirty_x1=None):
+        # Sends a frame from any buffer of the panel's size: all of it, or for every page the
+        # column range dirty_x0[page]..dirty_x1[page] (pages with x0 > x1 are skipped).
+        # The dirty state of this framebuffer is left alone.
+        self.flush_count += 1
+        if dirty_x0 is None:
+            self._set_window(0, self.width - 1, 0, self.pages - 1)
+            self.write_data(view)
+            self.data_bytes_sent += len(view)
+            return
+        # Partial flush: one column window per dirty page.
+        for page in range(self.pages):
+            x0 = dirty_x0[page]
+            x1 = dirty_x1[page]
+            if x0 > x1:
+                continue
+            self._set_window(x0, x1, page, page)
+            start = page * self.width
+            self.write_data(view[start + x0 : start + x1 + 1])
+            self.data_bytes_sent += x1 - x0 + 1
 
 
 class SSD1306_I2C(SSD1306):
@@ -107,16 +287,28 @@ class SSD1306_I2C(SSD1306):
         self.addr = addr
         self.temp = bytearray(2)
         self.write_list = [b"\x40", None]  # Co=0, D/C#=1
+        self.cmd_list = [b"\x00", None]  # Co=0, D/C#=0
         super().__init__(width, height, external_vcc)
 
     def write_cmd(self, cmd):
         self.temp[0] = 0x80  # Co=1, D/C#=0
         self.temp[1] = cmd
         self.i2c.writeto(self.addr, self.temp)
+        self.bytes_sent += 2
+        self.transactions += 1
+
+    def write_cmds(self, cmds):
+        # A sequence of command bytes behind one control byte, in a single transaction.
+        self.cmd_list[1] = cmds
+        self.i2c.writevto(self.addr, self.cmd_list)
+        self.bytes_sent += 1 + len(cmds)
+        self.transactions += 1
 
     def write_data(self, buf):
         self.write_list[1] = buf
         self.i2c.writevto(self.addr, self.write_list)
+        self.bytes_sent += 1 + len(buf)
+        self.transactions += 1
 
 
 class SSD1306_SPI(SSD1306):
@@ -145,6 +337,18 @@ class SSD1306_SPI(SSD1306):
         self.cs(0)
         self.spi.write(bytearray([cmd]))
         self.cs(1)
+        self.bytes_sent += 1
+        self.transactions += 1
+
+    def write_cmds(self, cmds):
+        self.spi.init(baudrate=self.rate, polarity=0, phase=0)
+        self.cs(1)
+        self.dc(0)
+        self.cs(0)
+        self.spi.write(cmds)
+        self.cs(1)
+        self.bytes_sent += len(cmds)
+        self.transactions += 1
 
     def write_data(self, buf):
         self.spi.init(baudrate=self.rate, polarity=0, phase=0)
@@ -152,4 +356,6 @@ class SSD1306_SPI(SSD1306):
         self.dc(1)
         self.cs(0)
         self.spi.write(buf)
-        self.cs(1)
\ No newline at end of file
+        self.cs(1)
+        self.bytes_sent += len(buf)
+        self.transactions += 1
\ No newline at end of file
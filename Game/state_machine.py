@@ -0,0 +1,116 @@
+# state_machine.py
+# A small table-driven state machine for the game screens. Every screen is a small integer
+# and registers up to three handlers in a dispatch table:
+#
+#     enter()                 runs once when the screen becomes active, draws the screen
+#     update(pressed_button)  runs every tick, only redraws when something on screen changed
+#     exit()                  runs once when the screen is left
+#
+# Handlers switch screens with go(). For every screen the machine counts ticks, time spent in
+# update() and frames rendered, so the work each screen does per tick can be compared.
+
+import utime
+
+# Screen ids, used as indexes into the handler tables.
+MENU = 0
+GAME = 1
+FEEDBACK = 2
+GAME_OVER = 3
+WIN = 4
+INFO = 5
+DEBUG = 6
+
+NAMES = ("MENU", "GAME", "FEEDBACK", "GAME_OVER", "WIN", "INFO", "DEBUG")
+
+# Microsecond clock for the per screen statistics (replaceable, like tracing.clock).
+clock = utime.ticks_us
+
+
+def _no_enter():
+    pass
+
+
+def _no_update(pressed_button):
+    pass
+
+
+class StateMachine:
+    # Dispatches ticks to the handlers of the active screen and runs the transitions.
+
+    def __init__(self, state, frame_counter=None):
+        # state.current_screen always holds the id of the active screen.
+        # frame_counter() returns the number of frames rendered so far (optional, for the stats).
+        self.state = state
+        self.frame_counter = frame_counter
+        count = len(NAMES)
+        self._enter = [_no_enter] * count
+        self._update = [_no_update] * count
+        self._exit = [_no_enter] * count
+        self.current = -1   # no screen until the first go()
+        self._next = -1     # screen requested while a transition is already running
+        self._switching = False
+        # Per screen statistics. A tick that switches screens is counted for the screen it started on.
+        self.ticks = [0] * count
+        self.busy_us = [0] * count
+        self.max_us = [0] * count
+        self.enters = [0] * count
+        self.frames = [0] * count
+
+    def register(self, screen, enter=None, update=None, exit=None):
+        if enter is not None:
+            self._enter[screen] = enter
+        if update is not None:
+            self._update[screen] = update
+        if exit is not None:
+            self._exit[screen] = exit
+
+    def go(self, screen):
+        # Leaves the active screen and enters the given one. Going to the active screen
+        # runs its exit and enter handlers again (e.g. GAME -> GAME for the next round).
+        self._next = screen
+        if self._switching:
+            # Called from an enter/exit handler, the loop below picks it up.
+            return
+        self._switching = True
+        while self._next >= 0:
+            screen = self._next
+            self._next = -1
+            if self.current >= 0:
+                self._exit[self.current]()
+            self.current = screen
+            self.state.current_screen = screen
+            self.enters[screen] += 1
+            self._enter[screen]()
+        self._switching = False
+
+    def tick(self, pressed_button):
+        # Runs the update handler of the active screen. pressed_button is a button name or None.
+        screen = self.current
+        frames = self.frame_counter() if self.frame_counter else 0
+        start = clock()
+        self._update[screen](pressed_button)
+        used = utime.ticks_diff(clock(), start)
+        self.ticks[screen] += 1
+        self.busy_us[screen] += used
+        if used > self.max_us[screen]:
+            self.max_us[screen] = used
+        if self.frame_counter:
+            self.frames[screen] += self.frame_counter() - frames
+
+    def clear_stats(self):
+        for screen in range(len(NAMES)):
+            self.ticks[screen] = 0
+            self.busy_us[screen] = 0
+            self.max_us[screen] = 0
+            self.enters[screen] = 0
+            self.frames[screen] = 0
+
+    def report(self):
+        # Prints the per screen statistics to the serial console.
+        print("screen      ticks   avg us   max us  enters  frames")
+        for screen in range(len(NAMES)):
+            ticks = self.ticks[screen]
+            if ticks == 0 and self.enters[screen] == 0:
+                continue
+            avg = self.busy_us[screen] // ticks if ticks else 0
+            print(f"{NAMES[screen]:10} {ticks:6} {avg:8} {self.max_us[screen]:8} {self.enters[screen]:7} {self.frames[screen]:7}")
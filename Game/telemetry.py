@@ -0,0 +1,110 @@
+# telemetry.py
+# Records one small binary record per game round (level, mode, task, answer time, result) for
+# tuning the difficulty. Records are packed with struct into a RAM buffer allocated at startup,
+# and only written to flash by flush(), which main.py calls on the idle screens (menu, win,
+# game over, and the feedback screen once the buffer is half full), so the game loop never
+# waits for the flash during a round. Rounds that don't fit in a full buffer are counted in
+# 'dropped' and reported.
+#
+# File layout: the header b"BBT" + record size (1 byte), then records of RECORD_FORMAT.
+# The file is appended to across power cycles and the game ids restart at 1 on every boot, so
+# the first flush of a boot writes a session marker (outcome SESSION, other fields 0) before
+# its records. Simulator/decode_telemetry.py numbers the sessions by these markers.
+
+import os
+import struct
+import utime
+import config
+
+# game, level, mode, task, answer time (ms), outcome, score after the round
+RECORD_FORMAT = "<HBBHIBH"
+RECORD_SIZE = struct.calcsize(RECORD_FORMAT)
+FIELDS = ("game", "level", "mode", "task", "answer_ms", "outcome", "score")
+HEADER = b"BBT" + bytes([RECORD_SIZE])
+
+MODES = ("CLASSIC", "REVERSE")
+WRONG = 0
+CORRECT = 1
+TIMEOUT = 2
+OUTCOMES = ("wrong", "correct", "timeout")
+SESSION = 0xFF  # outcome of the session marker record
+
+
+class Telemetry:
+    # Collects round records in RAM and appends them to the telemetry file in one block.
+
+    def __init__(self, filename=config.TELEMETRY_FILE, capacity=config.TELEMETRY_BUFFER_RECORDS):
+        self.filename = filename
+        self.capacity = capacity
+        self.enabled = config.TELEMETRY_ENABLED
+        self._buffer = bytearray(capacity * RECORD_SIZE)
+        self._view = memoryview(self._buffer)
+        self._count = 0
+        self._game = 0
+        self._round_start = 0
+        self._full = False  # warned about the full buffer since the last flush
+        self._marker = struct.pack(RECORD_FORMAT, 0, 0, 0, 0, 0, SESSION, 0)
+        self._marker_written = False  # the session marker of this boot is in the file
+        # Statistics.
+        self.dropped = 0            # records lost because the buffer was full
+        self.written = 0            # records written to flash
+        self.last_flush_us = 0
+
+    def new_game(self):
+        self._game = (self._game + 1) & 0xFFFF
+
+    def start_round(self):
+        # Call when a task is shown, the answer time is measured from here.
+        self._round_start = utime.ticks_ms()
+
+    def record(self, level, mode, task, outcome, score):
+        # Packs one round into the buffer. No flash access and no allocation.
+        if not self.enabled:
+            return
+        if self._count == self.capacity:
+            if not self._full:
+                self._full = True
+                print(f"Telemetry: buffer full ({self.capacity} records), dropping rounds until the next flush")
+            self.dropped += 1
+            return
+        answer_ms = utime.ticks_diff(utime.ticks_ms(), self._round_start)
+        mode_id = 0 if mode == "CLASSIC" else 1
+        struct.pack_into(RECORD_FORMAT, self._buffer, self._count * RECORD_SIZE,
+                         self._game, level, mode_id, task, answer_ms, outcome, score)
+        self._count += 1
+
+    def pending(self):
+        return self._count
+
+    def half_full(self):
+        return self._count * 2 >= self.capacity
+
+    def report(self):
+        print(f"Telemetry: {self.written} records written, {self._count} buffered, {self.dropped} dropped, last flush {self.last_flush_us} us")
+
+    def flush(self):
+        # Appends the buffered records to the file in a single write. Only call this on idle screens.
+        if self._count == 0:
+            return
+        start = utime.ticks_us()
+        try:
+            os.stat(self.filename)
+            new_file = False
+        except OSError:
+            new_file = True
+        try:
+            with open(self.filename, "ab") as f:
+                if new_file:
+                    f.write(HEADER)
+                if not self._marker_written:
+                    f.write(self._marker)
+                f.write(self._view[:self._count * RECORD_SIZE])
+        except OSError as e:
+            print(f"Error writing telemetry: {e}")
+            return
+        self._marker_written = True
+        self.written += self._count
+        self._count = 0
+        self._full = False
+        self.last_flush_us = utime.ticks_diff(utime.ticks_us(), start)
+        self.report()
@@ -0,0 +1,166 @@
+# text_cache.py
+# Pre-rasterised text for the HUD. Fixed labels ("Lvl:", "Mode: D->B", ...) and single glyphs
+# are rendered once into small 8 px high framebuffers and composed onto the screen with blit().
+#
+# Values that change during a round (time, player input) are drawn as "runs": a run remembers
+# the text it put on the screen, and drawing it again only re-blits the characters that differ.
+# A bit toggle or the countdown then touches one glyph instead of the whole frame.
+#
+# Runs take their text as a bytearray filled with format_int()/format_bits(), and the glyphs are
+# drawn with the display's unmarked text/blit helpers, so updating a run allocates nothing on the heap.
+
+import framebuf
+import config
+
+# Longest text a run can hold.
+RUN_LENGTH = 24
+
+_FIRST_CHAR = 0x20
+_LAST_CHAR = 0x7E
+_SPACE = 0x20
+
+
+def format_int(buf, pos, value):
+    # Writes a non-negative value in decimal into buf at pos. Returns the position after it.
+    end = pos
+    rest = value
+    while True:
+        end += 1
+        rest //= 10
+        if rest == 0:
+            break
+    i = end
+    while True:
+        i -= 1
+        buf[i] = 0x30 + value % 10
+        value //= 10
+        if value == 0:
+            break
+    return end
+
+
+def format_bits(buf, pos, value, width):
+    # Writes the lowest 'width' bits of value as '0'/'1', most significant first. Returns the end.
+    for i in range(width):
+        buf[pos + i] = 0x31 if (value >> (width - 1 - i)) & 1 else 0x30
+    return pos + width
+
+
+class TextCache:
+    # Label and glyph strips plus the state of the runs currently on the screen.
+
+    def __init__(self, oled, runs=2, max_bytes=config.TEXT_CACHE_MAX_BYTES):
+        self.oled = oled
+        self.enabled = max_bytes > 0
+        self.max_bytes = max_bytes
+        self._strips = {}   # label -> FrameBuffer, 8 px high
+        self._glyphs = [None] * (_LAST_CHAR - _FIRST_CHAR + 1)  # char code -> FrameBuffer
+        # One-character strings for oled.text(), made once so erasing a glyph doesn't create them.
+        self._chars = tuple(chr(code) for code in range(_FIRST_CHAR, _LAST_CHAR + 1))
+        self.bytes_used = 0
+        self.hits = 0
+        self.misses = 0
+        # Per run: the text on the screen, its length (-1 = nothing drawn), position and source value.
+        self._text = [bytearray(RUN_LENGTH) for _ in range(runs)]
+        self._length = [-1] * runs
+        self._x = [0] * runs
+        self._y = [0] * runs
+        self._value = [0] * runs
+
+    def _rasterise(self, text):
+        # A new 8 px high strip with the text, or None when the cache is full.
+        size = len(text) * 8
+        if self.bytes_used + size > self.max_bytes:
+            return None
+        strip = framebuf.FrameBuffer(bytearray(size), size, 8, framebuf.MONO_VLSB)
+        strip.text(text, 0, 0, 1)
+        self.bytes_used += size
+        return strip
+
+    def draw(self, text, x, y):
+        # Draws a recurring label. Like oled.text(), only the set pixels are drawn.
+        strip = None
+        if self.enabled:
+            strip = self._strips.get(text)
+            if strip is None:
+                self.misses += 1
+                strip = self._rasterise(text)
+                if strip is not None:
+                    self._strips[text] = strip
+            else:
+                self.hits += 1
+        if strip is None:
+            self.oled.text(text, x, y)
+        else:
+            self.oled.blit_area(strip, x, y, len(text) * 8, 8, 0)
+
+    def _put(self, code, x, y):
+        # Draws one character from the glyph cache.
+        if code == _SPACE:
+            return
+        index = code - _FIRST_CHAR
+        if not self.enabled:
+            self.oled.text_unmarked(self._chars[index], x, y, 1)
+            self.oled.mark_dirty(x, y, 8, 8)
+            return
+        strip = self._glyphs[index]
+        if strip is None:
+            self.misses += 1
+            strip = self._rasterise(self._chars[index])
+            self._glyphs[index] = strip
+        else:
+            self.hits += 1
+        if strip is None:
+            self.oled.text_unmarked(self._chars[index], x, y, 1)
+        else:
+            self.oled.blit_unmarked(strip, x, y, 0)
+        self.oled.mark_dirty(x, y, 8, 8)
+
+    def _erase(self, code, x, y):
+        # Clears exactly the pixels of one character, neighbouring text stays untouched.
+        if code == _SPACE:
+            return
+        self.oled.text_unmarked(self._chars[code - _FIRST_CHAR], x, y, 0)
+        self.oled.mark_dirty(x, y, 8, 8)
+
+    def reset(self):
+        # Forgets all runs, call after the screen was cleared.
+        for run in range(len(self._length)):
+            self._length[run] = -1
+
+    def changed(self, run, value):
+        # True when 'value' differs from the value the run was last drawn for (and remembers it),
+        # so the caller only formats a new text when something actually changed.
+        if self._value[run] == value and self._length[run] >= 0:
+            return False
+        self._value[run] = value
+        return True
+
+    def draw_run(self, run, text, length, x, y):
+        # Draws the first 'length' bytes of text at x, y over what the run showed before,
+        # re-blitting only the characters that changed.
+        old = self._text[run]
+        count = self._length[run]
+        if count > 0 and (self._x[run] != x or self._y[run] != y):
+            # Moved (e.g. right-aligned and one digit longer): erase it and draw it afresh.
+            old_x = self._x[run]
+            old_y = self._y[run]
+            for i in range(count):
+                self._erase(old[i], old_x + i * 8, old_y)
+            count = 0
+        for i in range(length):
+            code = text[i]
+            if i < count:
+                if old[i] == code:
+                    continue
+                self._erase(old[i], x + i * 8, y)
+            self._put(code, x + i * 8, y)
+            old[i] = code
+        for i in range(length, count):
+            self._erase(old[i], x + i * 8, y)
+        self._length[run] = length
+        self._x[run] = x
+        self._y[run] = y
+
+    def memory_used(self):
+        return self.bytes_used
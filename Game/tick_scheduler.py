@@ -0,0 +1,77 @@
+# tick_scheduler.py
+# Paces the main loop. Instead of sleeping a fixed 10 ms after every iteration (so a 60 ms flush
+# made that tick 70 ms long), every tick gets a budget and wait() only sleeps for what is left
+# of it. A tick that used up its whole budget is an overrun: the next one starts right away,
+# there is no catching up with a burst of short ticks.
+#
+# On screens that only wait for a button (config.IDLE_TICK_SCREENS) the loop drops to a slow
+# tick once sound and LEDs are quiet. With config.IDLE_LIGHTSLEEP the idle time is spent in
+# machine.lightsleep(), which the button interrupts of input_handler wake up early (needs
+# INPUT_USE_IRQ, and the USB serial console stops while the chip sleeps).
+#
+#     scheduler = tick_scheduler.TickScheduler()
+#     while True:
+#         ...
+#         scheduler.wait(screen, idle_allowed)
+
+import machine
+import utime
+import config
+import state_machine
+
+
+class TickScheduler:
+    # Ends each tick at its budget and keeps statistics on how well that works.
+
+    def __init__(self, budget_ms=config.TICK_BUDGET_MS, idle_ms=config.IDLE_TICK_MS,
+                 idle_screens=config.IDLE_TICK_SCREENS):
+        self.budget_us = budget_ms * 1000
+        self.idle_us = idle_ms * 1000
+        self.idle = [name in idle_screens for name in state_machine.NAMES]
+        self.lightsleep = config.IDLE_LIGHTSLEEP and hasattr(machine, "lightsleep")
+        self._tick_start = utime.ticks_us()
+        self.clear_stats()
+
+    def clear_stats(self):
+        self.ticks = 0
+        self.idle_ticks = 0
+        self.overruns = 0
+        self.busy_us = 0          # time spent in the ticks themselves, without sleeping
+        self.max_busy_us = 0
+        self.stats_start = utime.ticks_us()
+
+    def wait(self, screen, idle_allowed=True):
+        # Call at the end of a tick. Sleeps until the tick's budget (or the idle period on an
+        # idle screen, when idle_allowed) has passed since the tick started.
+        now = utime.ticks_us()
+        busy = utime.ticks_diff(now, self._tick_start)
+        self.ticks += 1
+        self.busy_us += busy
+        if busy > self.max_busy_us:
+            self.max_busy_us = busy
+        if busy > self.budget_us:
+            self.overruns += 1
+        idle = idle_allowed and self.idle[screen]
+        if idle:
+            self.idle_ticks += 1
+            remaining = self.idle_us - busy
+        else:
+            remaining = self.budget_us - busy
+        if remaining > 0:
+            if idle and self.lightsleep:
+                machine.lightsleep(remaining // 1000)
+            else:
+                utime.sleep_us(remaining)
+            now = utime.ticks_us()
+        self._tick_start = now
+
+    def rate(self):
+        # Achieved ticks per second since the statistics were cleared.
+        elapsed = utime.ticks_diff(utime.ticks_us(), self.stats_start)
+        return self.ticks * 1000000 // elapsed if elapsed > 0 else 0
+
+    def report(self):
+        # Prints the achieved tick rate and the overruns to the serial console.
+        avg = self.busy_us // self.ticks if self.ticks else 0
+        print(f"Ticks: {self.rate()}/s (budget {self.budget_us // 1000} ms, idle {self.idle_us // 1000} ms), {self.ticks} ticks, {self.idle_ticks} idle")
+        print(f"Ticks: {self.overruns} overruns, busy avg {avg} us, max {self.max_busy_us} us")
@@ -0,0 +1,108 @@
+# tracing.py
+# A lightweight tracer for the hot path of the game loop. Spans (input poll, state handler,
+# render, flush, audio, LEDs) are stored as durations in a fixed-size ring buffer allocated at
+# import, and summarised as p50/p95/max per span on demand.
+#
+#     t0 = tracing.begin()
+#     ... work ...
+#     tracing.end(tracing.SPAN_FLUSH, t0)
+#
+# When config.TRACE_ENABLED is False both calls return straight away.
+
+import array
+import utime
+import config
+
+# Span ids.
+SPAN_INPUT = 0
+SPAN_MENU = 1
+SPAN_GAME = 2
+SPAN_FEEDBACK = 3
+SPAN_GAME_OVER = 4
+SPAN_WIN = 5
+SPAN_INFO = 6
+SPAN_RENDER = 7
+SPAN_FLUSH = 8
+SPAN_AUDIO = 9
+SPAN_LEDS = 10
+SPAN_DEBUG = 11
+
+NAMES = ("input", "menu", "game", "feedback", "game_over", "win", "info", "render", "flush", "audio", "leds", "debug")
+
+# State handler span for each screen, indexed by the screen ids of state_machine.py.
+SCREEN_SPANS = (SPAN_MENU, SPAN_GAME, SPAN_FEEDBACK, SPAN_GAME_OVER, SPAN_WIN, SPAN_INFO, SPAN_DEBUG)
+
+enabled = config.TRACE_ENABLED
+# Microsecond clock used for the spans. The simulator replaces it with a wall clock,
+# because its utime only moves on sleep().
+clock = utime.ticks_us
+
+_size = config.TRACE_BUFFER_SIZE
+_spans = bytearray(_size)
+_durations = array.array("i", [0] * _size)
+_pos = 0
+_count = 0
+# Totals since the last clear(), so rare spans (a flush) are not lost when frequent ones fill the ring.
+_total_count = array.array("i", [0] * len(NAMES))
+_total_max = array.array("i", [0] * len(NAMES))
+
+
+def begin():
+    # Returns the start timestamp for end(), or 0 when tracing is off.
+    if not enabled:
+        return 0
+    return clock()
+
+
+def end(span, start):
+    # Records the time since begin() under the given span id.
+    global _pos, _count
+    if not enabled:
+        return
+    duration = utime.ticks_diff(clock(), start)
+    _spans[_pos] = span
+    _durations[_pos] = duration
+    _total_count[span] += 1
+    if duration > _total_max[span]:
+        _total_max[span] = duration
+    _pos += 1
+    if _pos == _size:
+        _pos = 0
+    if _count < _size:
+        _count += 1
+
+
+def clear():
+    global _pos, _count
+    _pos = 0
+    _count = 0
+    for span in range(len(NAMES)):
+        _total_count[span] = 0
+        _total_max[span] = 0
+
+
+def summary():
+    # Returns {span_name: (count, p50_us, p95_us, max_us)} over the records still in the buffer.
+    per_span = {}
+    for i in range(_count):
+        per_span.setdefault(_spans[i], []).append(_durations[i])
+    result = {}
+    for span, durations in per_span.items():
+        durations.sort()
+        n = len(durations)
+        result[NAMES[span]] = (n, durations[n // 2], durations[min(n - 1, (n * 95) // 100)], durations[-1])
+    return result
+
+
+def dump():
+    # Prints the summary to the serial console. p50/p95/max come from the ring buffer,
+    # "total" and "all max" cover everything since the last clear().
+    print(f"--- trace: last {_count} spans ---")
+    print("span        count    p50us    p95us    maxus    total  all max")
+    stats = summary()
+    for span in range(len(NAMES)):
+        if _total_count[span] == 0:
+            continue
+        name = NAMES[span]
+        n, p50, p95, worst = stats.get(name, (0, 0, 0, 0))
+        print(f"{name:10} {n:6} {p50:8} {p95:8} {worst:8} {_total_count[span]:8} {_total_max[span]:8}")
@@ -0,0 +1,103 @@
+# bench_logic.py
+# Micro-benchmark of GameLogic: the old string-based paths (as they were before the lookup
+# tables) against the table lookups used now. Prints one JSON line per comparison.
+#
+#     python Simulator/bench_logic.py --bits 8
+
+import argparse
+import json
+import random
+import time
+import tracemalloc
+
+from sim import Simulation
+
+
+# --- The old implementations, kept here only for comparison ---
+
+def old_decimal_to_binary(n, width):
+    binary_str = bin(n)[2:]
+    padding = '0' * (width - len(binary_str))
+    return padding + binary_str
+
+
+def old_check_answer(player_input_str, task, width):
+    return player_input_str == old_decimal_to_binary(task, width)
+
+
+def old_level_rules(level):
+    time_limit = 0
+    if level < 4:
+        mode = "CLASSIC"
+    elif level < 7:
+        mode = "REVERSE"
+    elif level < 13:
+        mode = random.choice(["CLASSIC", "REVERSE"])
+    else:
+        mode = random.choice(["CLASSIC", "REVERSE"])
+        time_limit = max(5, 15 - (level - 13))
+    return mode, time_limit
+
+
+def timed(func, values, rounds):
+    # Returns (ns per call, bytes allocated per call) for func over all values.
+    start = time.perf_counter_ns()
+    for _ in range(rounds):
+        for value in values:
+            func(value)
+    elapsed = time.perf_counter_ns() - start
+    calls = rounds * len(values)
+    tracemalloc.start()
+    for value in values:
+        func(value)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed // calls, peak // len(values)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the old and the table-driven GameLogic paths.")
+    parser.add_argument("--bits", type=int, default=4, help="task width (config.BIT_WIDTH)")
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    sim = Simulation({"BIT_WIDTH": args.bits})
+    import game_logic
+    import game_state
+    logic = game_logic.GameLogic(sim.flash_path(sim.config.DIFFICULTY_FILE))
+    state = game_state.GameState()
+    width = args.bits
+    values = list(range(3, min(logic.max_value, 255) + 1))
+    levels = list(range(1, logic.max_level + 1))
+
+    def new_check(value):
+        state.current_mode = "CLASSIC"
+        state.current_task = value
+        state.player_input = value
+        return logic.check_answer(state)
+
+    def old_check(value):
+        return old_check_answer(old_decimal_to_binary(value, width), value, width)
+
+    comparisons = (
+        ("decimal_to_binary", lambda v: old_decimal_to_binary(v, width), logic.decimal_to_binary, values),
+        ("check_answer", old_check, new_check, values),
+        ("hud_task_text", lambda v: f"Task: {v}", lambda v: logic.task_text(v, "CLASSIC"), values),
+        ("level_rules", old_level_rules, lambda lvl: logic.level_table[lvl], levels),
+    )
+    for name, old, new, inputs in comparisons:
+        old_ns, old_alloc = timed(old, inputs, args.rounds)
+        new_ns, new_alloc = timed(new, inputs, args.rounds)
+        print(json.dumps({
+            "name": "logic:" + name,
+            "bits": width,
+            "old_ns_per_call": old_ns,
+            "new_ns_per_call": new_ns,
+            "speedup": round(old_ns / new_ns, 2) if new_ns else None,
+            "old_alloc_bytes_per_call": old_alloc,
+            "new_alloc_bytes_per_call": new_alloc,
+        }))
+
+
+if __name__ == "__main__":
+    main()
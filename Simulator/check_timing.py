@@ -0,0 +1,290 @@
+# check_timing.py
+# Checks the timing behaviour of the game modules on the virtual clock, with asserts, so a change
+# that breaks the tone lengths of the audio sequencer, loses button edges or changes the debounce
+# and hold timing is caught on a PC. The flash logs are checked the same way, in a temporary
+# folder: recovering the score log after a torn write and rotating it through its slots, and
+# decoding the telemetry file with Simulator/decode_telemetry.py. The chunked display flush is
+# checked against the emulated panel behind the simulated I2C bus.
+#
+#     python Simulator/check_timing.py
+#
+# Prints one line per check and exits with an error on the first failure.
+
+import csv
+import io
+import os
+import sys
+import tempfile
+
+from sim import Simulation
+import machine
+import utime
+
+
+def check_audio_sequencer():
+    Simulation({"AUDIO_TIMER_PERIOD_MS": 0})
+    import audio_manager
+    audio = audio_manager.AudioManager()
+    start = utime.ticks_ms()
+    audio.play_startup()
+    audio.play_error()
+    while audio.is_busy():
+        utime.advance_ms(1)
+        audio.tick()
+    tones = [(utime.ticks_diff(at, start), freq, length) for at, freq, length in audio.pwm.tones()]
+    assert tones == [(0, 392, 100), (100, 523, 100), (200, 659, 150), (350, 262, 200)], tones
+    assert audio.pwm.duty_u16() == 0
+
+
+def check_audio_queue_limit():
+    Simulation({"AUDIO_TIMER_PERIOD_MS": 0})
+    import config
+    import audio_manager
+    audio = audio_manager.AudioManager()
+    for _ in range(config.AUDIO_QUEUE_LENGTH + 5):
+        audio.play_press()
+    # One tone starts playing right away, the queue holds the rest up to its length.
+    assert audio.dropped == 4, audio.dropped
+
+
+def drive(inputs, edges, until_ms):
+    # Steps the virtual clock 1 ms at a time up to until_ms, applies the scripted edges
+    # (at_ms, button, level) and polls the input handler like the main loop does.
+    # Times are virtual ms since the simulation started. Returns [(ms, kind, button)].
+    import config
+    edges = sorted(edges)
+    events = []
+    while utime.ticks_ms() < until_ms:
+        now = utime.ticks_ms()
+        while edges and edges[0][0] <= now:
+            _, button, level = edges.pop(0)
+            machine.Pin.registry[config.BUTTON_PINS[button]].inject(level, now)
+        while True:
+            event = inputs.next_event()
+            if event is None:
+                break
+            events.append((now, event[0], event[1]))
+        utime.advance_ms(1)
+    return events
+
+
+def check_event_order():
+    Simulation({"INPUT_USE_IRQ": True})
+    import input_handler as ih
+    inputs = ih.InputHandler()
+    edges = [(100, "Bit 0", 0), (150, "Bit 1", 0), (200, "Bit 0", 1), (250, "Bit 1", 1)]
+    events = drive(inputs, edges, 400)
+    assert [(kind, button) for _, kind, button in events] == [
+        (ih.PRESS, "Bit 0"), (ih.PRESS, "Bit 1"), (ih.RELEASE, "Bit 0"), (ih.RELEASE, "Bit 1")], events
+
+
+def check_edges_while_busy():
+    # Presses made while the loop doesn't poll (a long flush) are kept and replayed in order.
+    Simulation({"INPUT_USE_IRQ": True})
+    import config
+    import input_handler as ih
+    inputs = ih.InputHandler()
+    for at_ms, button, level in ((100, "Bit 0", 0), (140, "Bit 0", 1), (160, "Bit 1", 0), (190, "Bit 1", 1)):
+        machine.Pin.registry[config.BUTTON_PINS[button]].inject(level, at_ms)
+    utime.advance_ms(200)
+    events = []
+    while True:
+        event = inputs.next_event()
+        if event is None:
+            break
+        events.append(event)
+    assert events == [(ih.PRESS, "Bit 0"), (ih.RELEASE, "Bit 0"),
+                      (ih.PRESS, "Bit 1"), (ih.RELEASE, "Bit 1")], events
+    assert inputs.overflows == 0
+
+
+def check_edge_overflow():
+    # A full ring buffer drops further edges and counts them.
+    Simulation({"INPUT_USE_IRQ": True})
+    import config
+    import input_handler as ih
+    inputs = ih.InputHandler()
+    pin = machine.Pin.registry[config.BUTTON_PINS["Bit 0"]]
+    edges = config.INPUT_EVENT_BUFFER_SIZE + 3
+    for i in range(edges):
+        pin.inject(i % 2, i)
+    # One slot stays free to tell a full buffer from an empty one.
+    assert inputs.pending_events() == config.INPUT_EVENT_BUFFER_SIZE - 1
+    assert inputs.overflows == edges - (config.INPUT_EVENT_BUFFER_SIZE - 1), inputs.overflows
+
+
+def bouncy(button, at_ms, level, bounces=3, gap_ms=2):
+    # A contact that settles at 'level' after a few bounces, gap_ms apart.
+    edges = []
+    for i in range(bounces * 2 + 1):
+        edges.append((at_ms + i * gap_ms, button, level if i % 2 == 0 else 1 - level))
+    return edges
+
+
+def check_debounce(use_irq):
+    Simulation({"INPUT_USE_IRQ": use_irq})
+    import input_handler as ih
+    inputs = ih.InputHandler()
+    edges = bouncy("Bit 0", 100, 0) + bouncy("Bit 0", 300, 1)
+    events = drive(inputs, edges, 500)
+    kinds = [(kind, button) for _, kind, button in events]
+    assert kinds == [(ih.PRESS, "Bit 0"), (ih.RELEASE, "Bit 0")], events
+    # The press is reported on the first edge, not after the bouncing settled.
+    assert events[0][0] <= 101, events
+    assert 300 <= events[1][0] <= 300 + 6 + 30 + 1, events
+
+
+def check_hold():
+    Simulation({})
+    import config
+    import input_handler as ih
+    inputs = ih.InputHandler()
+    hold_ms = config.BUTTON_TIMINGS["Cancel"][1]
+    events = drive(inputs, [(100, "Cancel", 0), (100 + hold_ms + 200, "Cancel", 1)], hold_ms + 500)
+    holds = [ms for ms, kind, _ in events if kind == ih.HOLD]
+    assert holds == [100 + hold_ms], events
+    # A short press never turns into a HOLD.
+    events = drive(inputs, [(hold_ms + 600, "Cancel", 0), (hold_ms + 700, "Cancel", 1)], hold_ms + 2000)
+    assert not [e for e in events if e[1] == ih.HOLD], events
+
+
+def check_repeat():
+    # HOLD after hold_ms, then REPEAT every repeat_ms until the release, other buttons unaffected.
+    Simulation({"BUTTON_TIMINGS": {"Bit 0": (30, 300, 100)}})
+    import input_handler as ih
+    inputs = ih.InputHandler()
+    events = drive(inputs, [(100, "Bit 0", 0), (100, "Bit 1", 0), (650, "Bit 0", 1)], 800)
+    timed = [(ms, kind) for ms, kind, button in events if button == "Bit 0" and kind in (ih.HOLD, ih.REPEAT)]
+    assert timed == [(400, ih.HOLD), (500, ih.REPEAT), (600, ih.REPEAT)], events
+    assert [kind for _, kind, button in events if button == "Bit 1"] == [ih.PRESS], events
+
+
+def check_score_log_rotation():
+    # Saves fill the slots in order, a full log is compacted into a new generation, and a
+    # reboot (a fresh ScoreLog) finds the newest score and continues in the right slot.
+    Simulation({})
+    import score_log
+    with tempfile.TemporaryDirectory() as folder:
+        name = os.path.join(folder, "highscore.log")
+        log = score_log.ScoreLog(name, slots=4)
+        assert not log.load()
+        for score in range(10, 70, 10):
+            log.append(score)
+        # Save 1 creates the log, saves 2-4 fill slots 1-3, save 5 compacts, save 6 goes to slot 1.
+        assert log.compactions == 2 and log.next_slot == 2, (log.compactions, log.next_slot)
+        assert os.path.getsize(name) == 4 * score_log.RECORD_SIZE
+        assert not os.path.exists(name + ".tmp")
+        again = score_log.ScoreLog(name, slots=4)
+        assert again.load()
+        assert (again.score, again.sequence, again.generation, again.next_slot) == (60, 6, 2, 2), \
+            (again.score, again.sequence, again.generation, again.next_slot)
+        assert again.erase_count() == 6 + 2 * again.blocks
+
+
+def check_score_log_torn_record():
+    # A record cut short by a power cut fails its checksum, the one before it is recovered.
+    Simulation({})
+    import score_log
+    with tempfile.TemporaryDirectory() as folder:
+        name = os.path.join(folder, "highscore.log")
+        log = score_log.ScoreLog(name, slots=8)
+        log.load()
+        for score in (100, 200, 300):
+            log.append(score)
+        with open(name, "r+b") as f:
+            f.seek(2 * score_log.RECORD_SIZE + 8)
+            f.write(b"\xff" * 8)  # the end of the newest record never reached the flash
+        again = score_log.ScoreLog(name, slots=8)
+        assert again.load()
+        assert (again.score, again.bad_records, again.next_slot) == (200, 1, 3), \
+            (again.score, again.bad_records, again.next_slot)
+        # The next save skips the torn slot and wins on the next boot.
+        again.append(250)
+        last = score_log.ScoreLog(name, slots=8)
+        assert last.load() and last.score == 250, last.score
+
+
+def check_telemetry_round_trip():
+    # Records packed on the "Pico" over two boots decode back to the same values, with one
+    # session per boot, and rounds that don't fit in the buffer are counted, not written.
+    with tempfile.TemporaryDirectory() as folder:
+        name = os.path.join(folder, "telemetry.bin")
+        rounds = []
+        for session in (1, 2):
+            Simulation({"TELEMETRY_ENABLED": True})
+            import telemetry
+            log = telemetry.Telemetry(name, capacity=3)
+            log.new_game()
+            for round_number in range(4):
+                answer_ms = 400 + 100 * round_number
+                log.start_round()
+                utime.advance_ms(answer_ms)
+                mode = telemetry.MODES[round_number % 2]
+                log.record(session, mode, 200 + round_number, round_number % 3, 10 * round_number)
+                if round_number < 3:
+                    rounds.append([str(session), "1", str(session), mode, str(200 + round_number),
+                                   str(answer_ms), telemetry.OUTCOMES[round_number % 3], str(10 * round_number)])
+            assert log.dropped == 1, log.dropped
+            log.flush()
+            log.flush()  # nothing buffered, no second session marker
+        import decode_telemetry
+        out = io.StringIO()
+        with open(name, "rb") as f:
+            count = decode_telemetry.decode(f, csv.writer(out))
+        rows = list(csv.reader(io.StringIO(out.getvalue())))
+        assert count == 6 and rows[0] == ["session"] + list(telemetry.FIELDS), (count, rows[0])
+        assert rows[1:] == rounds, rows
+        assert os.path.getsize(name) == len(telemetry.HEADER) + 8 * telemetry.RECORD_SIZE
+
+
+def check_chunked_flush_superseded():
+    # A chunked flush sends at most DISPLAY_FLUSH_PAGES_PER_TICK pages per step. A frame rendered
+    # while one is still in progress takes over from the top, the rest of the old one is never
+    # sent, and the panel ends up showing exactly the newest frame.
+    Simulation({"DISPLAY_FLUSH_PAGES_PER_TICK": 2})
+    import display_manager
+    display = display_manager.Display()
+    display.deferred = True
+    oled = display.oled
+    panel = oled.i2c.devices[oled.addr]
+    display.draw_win_screen(120, 100, True)
+    sent = oled.data_bytes_sent
+    display.flush_step()
+    assert display.flush_pending
+    assert oled.data_bytes_sent - sent <= 2 * oled.width, oled.data_bytes_sent - sent
+    display.draw_game_over_screen(37)
+    steps = 0
+    while display.flush_pending:
+        sent = oled.data_bytes_sent
+        display.flush_step()
+        assert oled.data_bytes_sent - sent <= 2 * oled.width, oled.data_bytes_sent - sent
+        steps += 1
+    assert display.superseded == 1, display.superseded
+    assert steps <= oled.pages // 2, steps
+    assert panel.ram == oled.buffer
+
+
+def main():
+    checks = (
+        ("audio sequencer timing", check_audio_sequencer),
+        ("audio queue limit", check_audio_queue_limit),
+        ("input event order", check_event_order),
+        ("input edges while busy", check_edges_while_busy),
+        ("input edge overflow", check_edge_overflow),
+        ("debounce (IRQ)", lambda: check_debounce(True)),
+        ("debounce (polling)", lambda: check_debounce(False)),
+        ("hold", check_hold),
+        ("hold and repeat", check_repeat),
+        ("score log rotation", check_score_log_rotation),
+        ("score log torn record", check_score_log_torn_record),
+        ("telemetry round trip", check_telemetry_round_trip),
+        ("chunked flush superseded", check_chunked_flush_superseded),
+    )
+    for name, check in checks:
+        check()
+        print(f"ok  {name}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
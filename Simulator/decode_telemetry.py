@@ -0,0 +1,59 @@
+# decode_telemetry.py
+# Turns a telemetry file copied from the Pico (see Game/telemetry.py) into CSV.
+# The file is read record by record, so it can be of any size. Every boot of the Pico starts a
+# new session (a marker record in the file); the "session" column numbers them from 1, records
+# from files written before the markers existed get session 0.
+#
+#     python Simulator/decode_telemetry.py telemetry.bin > rounds.csv
+
+import argparse
+import csv
+import struct
+import sys
+
+import sim  # puts the Game folder on the import path
+import telemetry
+
+
+def decode(f, writer):
+    # Writes one CSV row per record of the open file f. Returns the number of records.
+    header = f.read(len(telemetry.HEADER))
+    if header[:3] != telemetry.HEADER[:3]:
+        raise ValueError("not a telemetry file")
+    size = header[3]
+    if size != telemetry.RECORD_SIZE:
+        raise ValueError(f"record size {size}, this decoder reads {telemetry.RECORD_SIZE}")
+    writer.writerow(("session",) + telemetry.FIELDS)
+    session = 0
+    count = 0
+    while True:
+        record = f.read(size)
+        if len(record) < size:
+            break
+        game, level, mode, task, answer_ms, outcome, score = struct.unpack(telemetry.RECORD_FORMAT, record)
+        if outcome == telemetry.SESSION:
+            session += 1
+            continue
+        writer.writerow((session, game, level, telemetry.MODES[mode], task, answer_ms, telemetry.OUTCOMES[outcome], score))
+        count += 1
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Decode a Binary Breaker telemetry file into CSV.")
+    parser.add_argument("file", help="telemetry file copied from the Pico")
+    parser.add_argument("--output", help="CSV file to write (default: standard output)")
+    args = parser.parse_args()
+
+    out = open(args.output, "w", newline="") if args.output else sys.stdout
+    try:
+        with open(args.file, "rb") as f:
+            count = decode(f, csv.writer(out))
+    finally:
+        if args.output:
+            out.close()
+    print(f"{count} records", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+# framebuf.py
+# Pure-Python stand-in for MicroPython's framebuf module.
+# Only the MONO_VLSB format is implemented, which is what the SSD1306 driver uses:
+# each byte is a vertical strip of 8 pixels, bit 0 at the top.
+
+MONO_VLSB = 0
+MONO_HLSB = 3
+MONO_HMSB = 4
+RGB565 = 1
+GS2_HMSB = 5
+GS4_HMSB = 2
+GS8 = 6
+
+# 8x8 font for characters 0x20..0x7E, one byte per row, bit 0 is the leftmost pixel.
+_FONT_ROWS = (
+    "0000000000000000", "183C3C1818001800", "3636000000000000", "36367F367F363600",
+    "0C3E031E301F0C00", "006333180C666300", "1C361C6E3B336E00", "0606030000000000",
+    "180C0606060C1800", "060C1818180C0600", "00663CFF3C660000", "000C0C3F0C0C0000",
+    "00000000000C0C06", "0000003F00000000", "00000000000C0C00", "6030180C06030100",
+    "3E63737B6F673E00", "0C0E0C0C0C0C3F00", "1E33301C06333F00", "1E33301C30331E00",
+    "383C36337F307800", "3F031F3030331E00", "1C06031F33331E00", "3F3330180C0C0C00",
+    "1E33331E33331E00", "1E33333E30180E00", "000C0C00000C0C00", "000C0C00000C0C06",
+    "180C0603060C1800", "00003F00003F0000", "060C1830180C0600", "1E3330180C000C00",
+    "3E637B7B7B031E00", "0C1E33333F333300", "3F66663E66663F00", "3C66030303663C00",
+    "1F36666666361F00", "7F46161E16467F00", "7F46161E16060F00", "3C66030373667C00",
+    "3333333F33333300", "1E0C0C0C0C0C1E00", "7830303033331E00", "6766361E36666700",
+    "0F06060646667F00", "63777F7F6B636300", "63676F7B73636300", "1C36636363361C00",
+    "3F66663E06060F00", "1E3333333B1E3800", "3F66663E36666700", "1E33070E38331E00",
+    "3F2D0C0C0C0C1E00", "3333333333333F00", "33333333331E0C00", "6363636B7F776300",
+    "6363361C1C366300", "3333331E0C0C1E00", "7F6331184C667F00", "1E06060606061E00",
+    "03060C1830604000", "1E18181818181E00", "081C366300000000", "00000000000000FF",
+    "0C0C180000000000", "00001E303E336E00", "0706063E66663B00", "00001E3303331E00",
+    "3830303E33336E00", "00001E333F031E00", "1C36060F06060F00", "00006E33333E301F",
+    "0706366E66666700", "0C000E0C0C0C1E00", "300030303033331E", "070666361E366700",
+    "0E0C0C0C0C0C1E00", "0000337F7F6B6300", "00001F3333333300", "00001E3333331E00",
+    "00003B66663E060F", "00006E33333E3078", "00003B6E66060F00", "00003E031E301F00",
+    "080C3E0C0C2C1800", "0000333333336E00", "00003333331E0C00", "0000636B7F7F3600",
+    "000063361C366300", "00003333333E301F", "00003F190C263F00", "380C0C070C0C3800",
+    "1818180018181800", "070C0C380C0C0700", "6E3B000000000000",
+)
+
+
+def _build_font():
+    # Turns the row-based table into 8 column bytes per glyph (bit 0 = top), matching MONO_VLSB.
+    font = []
+    for glyph in _FONT_ROWS:
+        rows = bytes.fromhex(glyph)
+        columns = bytearray(8)
+        for x in range(8):
+            column = 0
+            for y in range(8):
+                if rows[y] & (1 << x):
+                    column |= 1 << y
+            columns[x] = column
+        font.append(bytes(columns))
+    return tuple(font)
+
+
+_FONT = _build_font()
+
+
+class FrameBuffer:
+
+    def __init__(self, buffer, width, height, format, stride=None):
+        if format != MONO_VLSB:
+            raise NotImplementedError("the simulator only supports framebuf.MONO_VLSB")
+        self._buf = buffer
+        self._width = width
+        self._height = height
+        self._stride = width if stride is None else stride
+        if len(buffer) < ((height + 7) // 8) * self._stride:
+            raise ValueError("buffer too small")
+
+    def fill(self, c):
+        value = 0xFF if c else 0x00
+        buf = self._buf
+        for i in range(((self._height + 7) // 8) * self._stride):
+            buf[i] = value
+
+    def pixel(self, x, y, c=None):
+        if not (0 <= x < self._width and 0 <= y < self._height):
+            return None
+        index = (y >> 3) * self._stride + x
+        bit = 1 << (y & 7)
+        if c is None:
+            return 1 if self._buf[index] & bit else 0
+        if c:
+            self._buf[index] |= bit
+        else:
+            self._buf[index] &= ~bit & 0xFF
+
+    def fill_rect(self, x, y, w, h, c):
+        # Clip to the buffer, then set whole column bytes where possible.
+        x0 = max(x, 0)
+        y0 = max(y, 0)
+        x1 = min(x + w, self._width)
+        y1 = min(y + h, self._height)
+        if x0 >= x1 or y0 >= y1:
+            return
+        buf = self._buf
+        stride = self._stride
+        yy = y0
+        while yy < y1:
+            page = yy >> 3
+            end = min(y1, (page + 1) << 3)
+            mask = ((0xFF << (yy & 7)) & 0xFF) & (0xFF >> (8 - (end - (page << 3))))
+            base = page * stride
+            if c:
+                for xx in range(x0, x1):
+                    buf[base + xx] |= mask
+            else:
+                inverse = ~mask & 0xFF
+                for xx in range(x0, x1):
+                    buf[base + xx] &= inverse
+            yy = end
+
+    def hline(self, x, y, w, c):
+        self.fill_rect(x, y, w, 1, c)
+
+    def vline(self, x, y, h, c):
+        self.fill_rect(x, y, 1, h, c)
+
+    def rect(self, x, y, w, h, c, f=False):
+        if f:
+            self.fill_rect(x, y, w, h, c)
+            return
+        self.fill_rect(x, y, w, 1, c)
+        self.fill_rect(x, y + h - 1, w, 1, c)
+        self.fill_rect(x, y, 1, h, c)
+        self.fill_rect(x + w - 1, y, 1, h, c)
+
+    def line(self, x1, y1, x2, y2, c):
+        # Bresenham's line algorithm.
+        dx = abs(x2 - x1)
+        dy = -abs(y2 - y1)
+        sx = 1 if x1 < x2 else -1
+        sy = 1 if y1 < y2 else -1
+        err = dx + dy
+        while True:
+            self.pixel(x1, y1, c)
+            if x1 == x2 and y1 == y2:
+                break
+            e2 = 2 * err
+            if e2 >= dy:
+                err += dy
+                x1 += sx
+            if e2 <= dx:
+                err += dx
+                y1 += sy
+
+    def text(self, s, x, y, c=1):
+        buf = self._buf
+        stride = self._stride
+        shift = y & 7
+        page = y >> 3
+        for char in s:
+            code = ord(char)
+            if code < 0x20 or code > 0x7E:
+                code = 0x7F
+            glyph = _FONT[code - 0x20] if code != 0x7F else b"\xff" * 8
+            for col in range(8):
+                xx = x + col
+                if xx < 0 or xx >= self._width:
+                    continue
+                bits = glyph[col]
+                if not bits:
+                    continue
+                if shift == 0 and 0 <= y and y + 8 <= self._height:
+                    index = page * stride + xx
+                    if c:
+                        buf[index] |= bits
+                    else:
+                        buf[index] &= ~bits & 0xFF
+                    continue
+                for row in range(8):
+                    if bits & (1 << row):
+                        self.pixel(xx, y + row, c)
+            x += 8
+
+    def scroll(self, xstep, ystep):
+        copy = FrameBuffer(bytearray(self._buf), self._width, self._height, MONO_VLSB, self._stride)
+        self.fill(0)
+        for yy in range(self._height):
+            for xx in range(self._width):
+                if copy.pixel(xx, yy):
+                    self.pixel(xx + xstep, yy + ystep, 1)
+
+    def blit(self, fbuf, x, y, key=-1, palette=None):
+        if palette is None and (key == -1 or key == 0):
+            self._blit_columns(fbuf, x, y, key)
+            return
+        for sy in range(fbuf._height):
+            for sx in range(fbuf._width):
+                c = fbuf.pixel(sx, sy)
+                if palette is not None:
+                    c = palette.pixel(c, 0)
+                if c != key:
+                    self.pixel(x + sx, y + sy, c)
+
+    def _blit_columns(self, src, x, y, key):
+        # Same result as the pixel loop for sources without a palette, a column byte at a time.
+        # key 0 only adds the set pixels, key -1 also copies the clear ones.
+        buf = self._buf
+        stride = self._stride
+        pages = (self._height + 7) // 8
+        for src_page in range((src._height + 7) // 8):
+            rows = min(8, src._height - src_page * 8)
+            row_mask = (1 << rows) - 1
+            top = y + src_page * 8
+            page = top >> 3
+            shift = top & 7
+            for sx in range(src._width):
+                xx = x + sx
+                if xx < 0 or xx >= self._width:
+                    continue
+                bits = src._buf[src_page * src._stride + sx] & row_mask
+                parts = ((page, (bits << shift) & 0xFF, (row_mask << shift) & 0xFF),)
+                if shift:
+                    parts += ((page + 1, bits >> (8 - shift), row_mask >> (8 - shift)),)
+                for target, value, mask in parts:
+                    if 0 <= target < pages and mask:
+                        index = target * stride + xx
+                        if key == 0:
+                            buf[index] |= value
+                        else:
+                            buf[index] = (buf[index] & ~mask & 0xFF) | value
@@ -0,0 +1,336 @@
+# machine.py
+# Host stand-in for the parts of MicroPython's machine module the game uses.
+# The classes keep a record of what the game did to them (pin levels, PWM tones),
+# so behaviour can be checked on a PC without a Pico attached.
+
+import utime
+
+
+class Pin:
+    IN = 0
+    OUT = 1
+    PULL_UP = 1
+    PULL_DOWN = 2
+    IRQ_FALLING = 4
+    IRQ_RISING = 8
+
+    # Every pin created so far, by pin number, so a script can find e.g. the button pins.
+    registry = {}
+
+    def __init__(self, id, mode=-1, pull=-1, value=None):
+        self.id = id
+        self.mode = mode
+        self.pull = pull
+        # Inputs with a pull-up idle high, like the real buttons.
+        self._value = 1 if pull == Pin.PULL_UP else 0
+        if value is not None:
+            self._value = 1 if value else 0
+        self._irq_handler = None
+        self._irq_trigger = 0
+        Pin.registry[id] = self
+
+    def value(self, *v):
+        if not v:
+            return self._value
+        self._set(1 if v[0] else 0)
+
+    def _set(self, level):
+        previous = self._value
+        self._value = level
+        if self._irq_handler is None or level == previous:
+            return
+        if (level == 0 and self._irq_trigger & Pin.IRQ_FALLING) or (level == 1 and self._irq_trigger & Pin.IRQ_RISING):
+            self._irq_handler(self)
+
+    def irq(self, handler=None, trigger=IRQ_FALLING | IRQ_RISING, hard=False):
+        self._irq_handler = handler
+        self._irq_trigger = trigger
+
+    def inject(self, level, at_ms=None):
+        # Drives the pin from outside, like a button would, firing the IRQ handler on an edge.
+        # With at_ms the handler sees that timestamp from utime.ticks_ms(), whatever the clock says.
+        if at_ms is None:
+            self._set(1 if level else 0)
+            return
+        utime._override_us = at_ms * 1000
+        try:
+            self._set(1 if level else 0)
+        finally:
+            utime._override_us = None
+
+    def __call__(self, *v):
+        return self.value(*v)
+
+    def low(self):
+        self._set(0)
+
+    def high(self):
+        self._set(1)
+
+    def on(self):
+        self._set(1)
+
+    def off(self):
+        self._set(0)
+
+    def toggle(self):
+        self._set(self._value ^ 1)
+
+    def init(self, mode=-1, pull=-1, value=None):
+        if mode != -1:
+            self.mode = mode
+        if value is not None:
+            self._set(1 if value else 0)
+
+
+class PWM:
+    # Records every change as (ticks_ms, frequency, duty_u16) in self.log.
+
+    def __init__(self, pin, freq=0, duty_u16=0):
+        self.pin = pin
+        self._freq = freq
+        self._duty = duty_u16
+        self.log = []
+
+    def _record(self):
+        self.log.append((utime.ticks_ms(), self._freq, self._duty))
+
+    def freq(self, *value):
+        if not value:
+            return self._freq
+        self._freq = value[0]
+        self._record()
+
+    def duty_u16(self, *value):
+        if not value:
+            return self._duty
+        self._duty = value[0]
+        self._record()
+
+    def deinit(self):
+        self._duty = 0
+        self._record()
+
+    def tones(self):
+        # Reduces the log to (start_ms, frequency, length_ms) for every audible section.
+        tones = []
+        start = None
+        freq = 0
+        for ticks, f, duty in self.log:
+            if start is not None and (duty == 0 or f != freq):
+                tones.append((start, freq, utime.ticks_diff(ticks, start)))
+                start = None
+            if duty > 0 and start is None:
+                start = ticks
+                freq = f
+        return tones
+
+
+class SSD1306Panel:
+    # Emulates the display controller behind the I2C bus: it decodes the command stream and keeps
+    # its own copy of the display RAM, so a test can check what the panel really shows.
+
+    # Number of argument bytes for SSD1306 commands that take any.
+    _ARGS = {0x20: 1, 0x21: 2, 0x22: 2, 0x81: 1, 0x8D: 1, 0xA8: 1, 0xD3: 1, 0xD5: 1, 0xD9: 1, 0xDA: 1, 0xDB: 1}
+
+    def __init__(self, width=128, height=64):
+        self.width = width
+        self.height = height
+        self.pages = height // 8
+        self.ram = bytearray(self.pages * width)
+        self.on = False
+        self.contrast = 0
+        self.inverted = False
+        self.commands = 0
+        self.data_bytes = 0
+        self._col_start, self._col_end = 0, width - 1
+        self._page_start, self._page_end = 0, self.pages - 1
+        self._col = 0
+        self._page = 0
+        self._pending = []
+
+    def command(self, byte):
+        self._pending.append(byte)
+        opcode = self._pending[0]
+        if len(self._pending) <= self._ARGS.get(opcode, 0):
+            return
+        args = self._pending[1:]
+        self._pending = []
+        self.commands += 1
+        if opcode == 0x21:
+            self._col_start, self._col_end = args
+            self._col = self._col_start
+        elif opcode == 0x22:
+            self._page_start, self._page_end = args
+            self._page = self._page_start
+        elif opcode == 0x81:
+            self.contrast = args[0]
+        elif opcode in (0xAE, 0xAF):
+            self.on = opcode == 0xAF
+        elif opcode in (0xA6, 0xA7):
+            self.inverted = opcode == 0xA7
+
+    def data(self, payload):
+        # Horizontal addressing: fill the column window, then move to the next page.
+        for byte in payload:
+            if 0 <= self._page < self.pages and 0 <= self._col < self.width:
+                self.ram[self._page * self.width + self._col] = byte
+            self.data_bytes += 1
+            if self._col >= self._col_end:
+                self._col = self._col_start
+                self._page = self._page + 1 if self._page < self._page_end else self._page_start
+            else:
+                self._col += 1
+
+    def write(self, payload):
+        # One I2C transaction: control byte(s) followed by commands or data.
+        i = 0
+        while i < len(payload):
+            control = payload[i]
+            i += 1
+            if control & 0x40:
+                self.data(payload[i:])
+                return
+            if control & 0x80:
+                # Co=1: a single command byte follows, then another control byte.
+                if i < len(payload):
+                    self.command(payload[i])
+                i += 1
+            else:
+                # Co=0: all remaining bytes are commands.
+                for byte in payload[i:]:
+                    self.command(byte)
+                return
+
+    def pixel(self, x, y):
+        return (self.ram[(y >> 3) * self.width + x] >> (y & 7)) & 1
+
+    def render(self, on="#", off="."):
+        # The panel contents as text, one line per pixel row.
+        return "\n".join("".join(on if self.pixel(x, y) else off for x in range(self.width)) for y in range(self.height))
+
+
+class I2C:
+    # Counts transactions and bytes, and forwards writes to the emulated device at each address.
+
+    # Every bus created so far, so a script can reach the one the game opened.
+    instances = []
+
+    def __init__(self, id=0, scl=None, sda=None, freq=400000):
+        I2C.instances.append(self)
+        self.id = id
+        self.freq = freq
+        self.devices = {0x3C: SSD1306Panel()}
+        self.transactions = 0
+        self.bytes_written = 0
+
+    def scan(self):
+        return sorted(self.devices)
+
+    def writeto(self, addr, buf, stop=True):
+        self.transactions += 1
+        self.bytes_written += len(buf)
+        device = self.devices.get(addr)
+        if device is None:
+            raise OSError(5)  # EIO, nothing acknowledged the address.
+        device.write(bytes(buf))
+        return len(buf)
+
+    def writevto(self, addr, vector, stop=True):
+        # The buffers go out back to back as a single transaction.
+        payload = b"".join(bytes(buf) for buf in vector)
+        self.writeto(addr, payload, stop)
+        return len(payload)
+
+    def reset_counters(self):
+        self.transactions = 0
+        self.bytes_written = 0
+
+
+class Timer:
+    ONE_SHOT = 0
+    PERIODIC = 1
+
+    # Timers only fire when utime's clock moves (utime.sleep*/advance_*), which keeps the
+    # callbacks on the main thread just like soft timer IRQs on the Pico.
+    _active = []
+
+    def __init__(self, id=-1, **kwargs):
+        self._callback = None
+        self._period_us = 0
+        self._mode = Timer.PERIODIC
+        self._due_us = None
+        if kwargs:
+            self.init(**kwargs)
+
+    def init(self, mode=PERIODIC, period=-1, callback=None, freq=-1):
+        if freq > 0:
+            self._period_us = 1000000 // freq
+        else:
+            self._period_us = int(period * 1000)
+        self._mode = mode
+        self._callback = callback
+        self._due_us = utime._now_us() + self._period_us
+        if self not in Timer._active:
+            Timer._active.append(self)
+
+    def deinit(self):
+        self._due_us = None
+        if self in Timer._active:
+            Timer._active.remove(self)
+
+    def _poll(self, now_us):
+        while self._due_us is not None and now_us >= self._due_us:
+            if self._mode == Timer.PERIODIC:
+                self._due_us += max(1, self._period_us)
+            else:
+                self.deinit()
+            if self._callback:
+                self._callback(self)
+
+    @staticmethod
+    def _fire_due(now_us):
+        for timer in list(Timer._active):
+            timer._poll(now_us)
+
+    @staticmethod
+    def _next_deadline():
+        deadlines = [t._due_us for t in Timer._active if t._due_us is not None]
+        return min(deadlines) if deadlines else None
+
+
+utime._listeners.append(Timer._fire_due)
+utime._deadline_hooks.append(Timer._next_deadline)
+
+
+def reset():
+    # Forgets all pins and timers, used between simulation runs.
+    Pin.registry.clear()
+    I2C.instances.clear()
+    for timer in list(Timer._active):
+        timer.deinit()
+
+
+def freq(*value):
+    return 125000000
+
+
+def unique_id():
+    return b"\x00SIMPICO"
+
+
+def idle():
+    utime.sleep_us(100)
+
+
+def lightsleep(time_ms=None):
+    if time_ms is not None:
+        utime.sleep_ms(time_ms)
+
+
+def disable_irq():
+    return 0
+
+
+def enable_irq(state=0):
+    pass
@@ -0,0 +1,32 @@
+# micropython.py
+# Host stand-in for MicroPython's micropython module.
+
+
+def const(value):
+    return value
+
+
+def _passthrough(func):
+    return func
+
+
+# Code emitters have no meaning on CPython, decorated functions run as normal Python.
+native = _passthrough
+viper = _passthrough
+
+
+def schedule(func, arg):
+    # On the Pico this defers the call out of IRQ context; here there is no IRQ context.
+    func(arg)
+
+
+def alloc_emergency_exception_buf(size):
+    pass
+
+
+def mem_info(*args):
+    print("mem_info: not available in the simulator")
+
+
+def opt_level(*args):
+    return 0
@@ -0,0 +1,206 @@
+# run_bench.py
+# Runs the benchmark suite on the host simulator: every screen renderer (Game/benchmark.py)
+# plus scripted game sessions played by a bot, and reports time per call or per loop iteration,
+# I2C traffic per frame and bytes allocated.
+#
+#     python Simulator/run_bench.py --output bench.json
+#     python Simulator/run_bench.py --compare bench.json --threshold 20
+#
+# The times are CPython times, useful for comparing two versions of the code with each other,
+# not as absolute numbers for the Pico. Run Game/benchmark.py on the board for those.
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+from sim import Simulation
+import state_machine as sm
+import utime
+
+
+class AutoPlayer:
+    # Plays the game by looking at the game state and pressing the right buttons.
+    # Every 'think_ms' it checks the screen; with mistake_rate > 0 it sometimes answers wrong.
+
+    def __init__(self, sim, think_ms=250, gap_ms=120, mistake_rate=0.0, seed=1):
+        self.sim = sim
+        self.think_ms = think_ms
+        self.gap_ms = gap_ms
+        self.mistake_rate = mistake_rate
+        self.random = random.Random(seed)
+        self._next_ms = think_ms
+        self._busy_until = 0
+
+    def _plan(self, state):
+        # Button presses that solve the current task from the current input.
+        target = state.current_task
+        if self.random.random() < self.mistake_rate:
+            target ^= 1
+        if state.current_mode == "CLASSIC":
+            # Toggle every bit that differs from the current input.
+            wanted = target ^ state.player_input
+        else:
+            wanted = target - state.player_sum
+        # Bits are entered bank by bank from the current one down, Confirm moves to the next bank.
+        presses = []
+        for bank in range(state.input_bank, -1, -1):
+            presses += [f"Bit {i}" for i in range(4) if wanted & (1 << (bank * 4 + i))]
+            presses.append("Confirm")
+        return presses
+
+    def __call__(self, now_us):
+        now_ms = now_us // 1000
+        if now_ms < self._next_ms or now_ms < self._busy_until:
+            return
+        self._next_ms = now_ms + self.think_ms
+        state = self.sim.globals.get("state")
+        if state is None:
+            return
+        if state.current_screen == sm.GAME:
+            presses = self._plan(state)
+        elif state.current_screen in (sm.MENU, sm.INFO, sm.WIN, sm.GAME_OVER):
+            presses = ["Confirm"]
+        else:
+            return
+        self._busy_until = self.sim.press_sequence(now_ms + 1, presses, self.gap_ms)
+
+
+def display_results(iterations):
+    Simulation()
+    # The renderers are timed with utime.ticks_us(), which has to follow real time here.
+    utime.use_wall_clock()
+    import benchmark
+    import display_manager
+    import game_state
+    display = display_manager.Display()
+    state = game_state.GameState()
+    return benchmark.display_suite(display, state, iterations)
+
+
+def session(name, duration_ms, mistake_rate, trace_allocs, seed=1):
+    # Plays one scripted session and measures every main loop iteration.
+    random.seed(seed)
+    sim = Simulation()
+    player = AutoPlayer(sim, mistake_rate=mistake_rate, seed=seed)
+    utime._listeners.append(player)
+    samples = []
+    allocs = []
+    marks = {"start": None}
+    # The main loop ends every iteration in TickScheduler.wait(), so the wall time between two
+    # waits is the cost of one iteration. Imported after Simulation(), so main.py uses this class.
+    import tick_scheduler
+    real_wait = tick_scheduler.TickScheduler.wait
+
+    def timed_wait(scheduler, screen, idle_allowed=True):
+        if marks["start"] is not None:
+            samples.append((time.perf_counter() - marks["start"]) * 1000000)
+            if trace_allocs:
+                allocs.append(tracemalloc.get_traced_memory()[1] - marks["base"])
+        try:
+            real_wait(scheduler, screen, idle_allowed)
+        finally:
+            if trace_allocs:
+                tracemalloc.reset_peak()
+                marks["base"] = tracemalloc.get_traced_memory()[0]
+            marks["start"] = time.perf_counter()
+
+    tick_scheduler.TickScheduler.wait = timed_wait
+    if trace_allocs:
+        tracemalloc.start()
+    try:
+        sim.run(duration_ms)
+    finally:
+        tick_scheduler.TickScheduler.wait = real_wait
+        utime._listeners.remove(player)
+        if trace_allocs:
+            tracemalloc.stop()
+
+    display = sim.globals["display"]
+    state = sim.globals["state"]
+    frames = max(1, display.oled.flush_count)
+    samples.sort()
+    count = max(1, len(samples))
+    result = {
+        "name": "session:" + name,
+        "iterations": len(samples),
+        "level_at_end": state.level,
+        "us_per_iteration": int(sum(samples) / count),
+        "us_p95": int(samples[int(count * 0.95) - 1]) if samples else 0,
+        "us_max": int(samples[-1]) if samples else 0,
+        "frames": display.oled.flush_count,
+        "i2c_bytes_per_frame": sim.i2c.bytes_written // frames,
+        "i2c_transactions_per_frame": sim.i2c.transactions // frames,
+    }
+    if trace_allocs:
+        result["alloc_bytes_per_iteration"] = int(sum(allocs) / max(1, len(allocs)))
+        result["alloc_bytes_max"] = max(allocs) if allocs else 0
+    return result
+
+
+def session_results(duration_ms):
+    results = []
+    for name, mistakes in (("perfect", 0.0), ("sloppy", 0.3)):
+        timing = session(name, duration_ms, mistakes, trace_allocs=False)
+        # A second, identical run with tracemalloc on, so tracing doesn't distort the timing.
+        allocs = session(name, duration_ms, mistakes, trace_allocs=True)
+        timing["alloc_bytes_per_iteration"] = allocs["alloc_bytes_per_iteration"]
+        timing["alloc_bytes_max"] = allocs["alloc_bytes_max"]
+        results.append(timing)
+    return results
+
+
+def compare(results, baseline_path, threshold):
+    # Prints the change of every timing against a saved run. Returns True if any got slower
+    # by more than 'threshold' percent.
+    with open(baseline_path) as f:
+        baseline = {r["name"]: r for r in json.load(f)["results"]}
+    regressed = False
+    for result in results:
+        old = baseline.get(result["name"])
+        if old is None:
+            continue
+        for key in ("us_per_call", "us_per_iteration", "i2c_bytes_per_call", "i2c_bytes_per_frame",
+                    "i2c_transactions_per_call", "i2c_transactions_per_frame",
+                    "alloc_bytes_per_call", "alloc_bytes_per_iteration"):
+            if key not in result or key not in old:
+                continue
+            before, after = old[key], result[key]
+            change = (after - before) * 100 / before if before else (100.0 if after else 0.0)
+            flag = ""
+            if change > threshold:
+                flag = "  <-- regression"
+                regressed = True
+            print(f"{result['name']:32} {key:26} {before:>9} -> {after:>9} ({change:+.1f}%){flag}")
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the game code on the host simulator.")
+    parser.add_argument("--iterations", type=int, default=20, help="calls per renderer benchmark")
+    parser.add_argument("--session-ms", type=int, default=60000, help="simulated length of each session")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--compare", metavar="BASELINE", help="compare with a JSON file from an earlier run")
+    parser.add_argument("--threshold", type=float, default=25.0, help="allowed slowdown in percent")
+    args = parser.parse_args()
+
+    # The game's own console output would drown the results.
+    with contextlib.redirect_stdout(io.StringIO()):
+        results = display_results(args.iterations) + session_results(args.session_ms)
+    for result in results:
+        print(json.dumps(result))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"platform": platform.python_implementation(), "results": results}, f, indent=1)
+    if args.compare and compare(results, args.compare, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+# run_game.py
+# Command line entry for the simulator: runs Game/main.py headless with scripted presses.
+#
+#     python Simulator/run_game.py --duration 8000 --press 500:Confirm --press 1200:"Bit 0" --show
+#
+# Buttons use the names from config.BUTTON_PINS ("Bit 0".."Bit 3", "Confirm", "Cancel").
+# --realtime runs on the wall clock, which the asyncio runtime needs (USE_ASYNC_RUNTIME=True)
+# and which gives the core 1 worker (DUAL_CORE=True) realistic time to run next to the loop.
+
+import argparse
+import time
+
+from sim import Simulation
+
+
+def parse_value(text):
+    for kind in (int, float):
+        try:
+            return kind(text)
+        except ValueError:
+            pass
+    if text in ("True", "False"):
+        return text == "True"
+    return text
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the Binary Breaker game on the host simulator.")
+    parser.add_argument("--duration", type=int, default=10000, help="simulated time in ms")
+    parser.add_argument("--press", action="append", default=[], metavar="MS:BUTTON[:HOLD_MS]",
+                        help="press a button at the given time, may be repeated")
+    parser.add_argument("--set", action="append", default=[], metavar="KEY=VALUE",
+                        help="override a value from config.py, may be repeated")
+    parser.add_argument("--realtime", action="store_true", help="use the wall clock instead of virtual time")
+    parser.add_argument("--show", action="store_true", help="print the panel contents at the end")
+    parser.add_argument("--trace", action="store_true", help="trace the main loop and print the summary at the end")
+    args = parser.parse_args()
+
+    overrides = {}
+    for item in args.set:
+        key, _, value = item.partition("=")
+        overrides[key] = parse_value(value)
+
+    if args.trace:
+        overrides["TRACE_ENABLED"] = True
+    sim = Simulation(overrides, realtime=args.realtime)
+    # The boot profile is printed on every start, its times also come from the wall clock.
+    import boot_profiler
+    boot_profiler.clock = lambda: time.perf_counter_ns() // 1000
+    # The worker thread waits on the wall clock, moving the virtual one is left to the main loop.
+    import core1_worker
+    core1_worker.pause = lambda ms: time.sleep(ms / 1000)
+    if args.trace:
+        # Span durations have to come from the wall clock, the virtual one stands still while code runs.
+        import state_machine
+        import tracing
+        tracing.clock = lambda: time.perf_counter_ns() // 1000
+        state_machine.clock = tracing.clock
+    for item in args.press:
+        parts = item.split(":")
+        hold_ms = int(parts[2]) if len(parts) > 2 else 80
+        sim.press(int(parts[0]), parts[1], hold_ms)
+    sim.run(args.duration)
+    worker = sim.globals.get("worker")
+    if worker is not None:
+        worker.stop()
+
+    print(sim.summary())
+    if args.trace:
+        tracing.dump()
+        if "screens" in sim.globals:
+            sim.globals["screens"].report()
+        if "scheduler" in sim.globals:
+            sim.globals["scheduler"].report()
+        if worker is not None:
+            worker.report()
+    if args.show and sim.panel:
+        print(sim.panel.render())
+
+
+if __name__ == "__main__":
+    main()
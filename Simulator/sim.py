@@ -0,0 +1,169 @@
+# sim.py
+# Runs the code from the Game folder on CPython, using the stand-ins for machine, utime,
+# framebuf and micropython from this folder. Time is virtual by default, so a session of
+# several minutes runs in a fraction of a second and always behaves the same way.
+#
+#     sim = Simulation()
+#     sim.press(500, "Confirm")
+#     sim.run(5000)
+#     print(sim.panel.render())
+
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+SIM_DIR = os.path.dirname(os.path.abspath(__file__))
+GAME_DIR = os.path.join(os.path.dirname(SIM_DIR), "Game")
+
+
+def setup_paths():
+    # Puts the stand-ins and the game modules on the import path.
+    for path in (GAME_DIR, SIM_DIR):
+        if path in sys.path:
+            sys.path.remove(path)
+        sys.path.insert(0, path)
+
+
+def forget_game_modules():
+    # Drops cached game modules, so the next run starts from a fresh config and fresh objects.
+    for name, module in list(sys.modules.items()):
+        path = getattr(module, "__file__", None) or ""
+        if os.path.dirname(os.path.abspath(path)) == GAME_DIR:
+            del sys.modules[name]
+
+
+setup_paths()
+
+import machine
+import utime
+
+
+class Simulation:
+    # One headless game session with scripted button presses.
+
+    def __init__(self, config_overrides=None, realtime=False, start_ms=0, flash_dir=None):
+        forget_game_modules()
+        machine.reset()
+        self.realtime = realtime
+        if realtime:
+            utime.use_wall_clock()
+        else:
+            utime.use_virtual_clock(start_ms)
+        utime.stop_at_ms(None)
+        import config
+        self.config = config
+        for key, value in (config_overrides or {}).items():
+            setattr(config, key, value)
+        # Scripted pin edges as (time_ms, pin_id, level), kept sorted by time.
+        self._script = []
+        # Files the game writes (high score, ...) go here instead of the current directory.
+        self.flash_dir = flash_dir or tempfile.mkdtemp(prefix="pico_flash_")
+        self._upload_data_files()
+        self.globals = {}
+        self.wall_time_s = 0.0
+        self.end_ms = 0
+
+    def _upload_data_files(self):
+        # Copies the data files the game reads (difficulty.txt, ...) to the flash folder, like
+        # uploading the Game folder to the Pico. Files already on the "flash" are kept.
+        for name in os.listdir(GAME_DIR):
+            source = os.path.join(GAME_DIR, name)
+            target = os.path.join(self.flash_dir, name)
+            if name.endswith(".txt") and os.path.isfile(source) and not os.path.exists(target):
+                shutil.copyfile(source, target)
+
+    def flash_path(self, name):
+        return os.path.join(self.flash_dir, name)
+
+    def press(self, at_ms, button, hold_ms=80):
+        # Presses a button at at_ms (virtual time) and releases it hold_ms later.
+        pin_id = self.config.BUTTON_PINS[button]
+        self._script.append((at_ms, pin_id, 0))
+        self._script.append((at_ms + hold_ms, pin_id, 1))
+        self._script.sort()
+        return self
+
+    def press_sequence(self, start_ms, buttons, gap_ms=150, hold_ms=80):
+        # Presses the buttons one after another, gap_ms apart. Returns the time after the last one.
+        at = start_ms
+        for button in buttons:
+            self.press(at, button, hold_ms)
+            at += gap_ms
+        return at
+
+    def _next_edge_us(self):
+        return self._script[0][0] * 1000 if self._script else None
+
+    def _apply_edges(self, now_us):
+        while self._script and self._script[0][0] * 1000 <= now_us:
+            at_ms, pin_id, level = self._script.pop(0)
+            pin = machine.Pin.registry.get(pin_id)
+            if pin is not None:
+                pin.inject(level, at_ms)
+
+    def _realtime_edges(self):
+        # In real-time mode the edges are injected from a helper thread, a bit like real IRQs.
+        while self._script:
+            at_ms = self._script[0][0]
+            delay = at_ms / 1000 - utime._now_us() / 1000000
+            if delay > 0:
+                time.sleep(delay)
+            self._apply_edges(utime._now_us())
+
+    def run(self, duration_ms, script="main.py"):
+        # Runs Game/main.py (or another script from the Game folder) until duration_ms.
+        self.end_ms = duration_ms
+        if self.realtime:
+            # The asyncio runtime stops itself after ASYNC_RUN_DURATION_MS, the plain main loop
+            # in the first sleep after the end.
+            self.config.ASYNC_RUN_DURATION_MS = duration_ms
+            utime.stop_at_ms(utime._now_us() // 1000 + duration_ms)
+            threading.Thread(target=self._realtime_edges, daemon=True).start()
+        else:
+            utime._listeners.append(self._apply_edges)
+            utime._deadline_hooks.append(self._next_edge_us)
+            utime.stop_at_ms(utime.ticks_ms() + duration_ms)
+        path = os.path.join(GAME_DIR, script)
+        with open(path) as f:
+            code = compile(f.read(), path, "exec")
+        # The script runs in a namespace we keep, so its objects (state, display, ...) can be
+        # inspected after the run, also when it was stopped by SimulationEnd.
+        self.globals = {"__name__": "__main__", "__file__": path}
+        cwd = os.getcwd()
+        os.chdir(self.flash_dir)
+        start = time.perf_counter()
+        try:
+            exec(code, self.globals)
+        except utime.SimulationEnd:
+            pass
+        finally:
+            self.wall_time_s = time.perf_counter() - start
+            os.chdir(cwd)
+            utime.stop_at_ms(None)
+            if self._apply_edges in utime._listeners:
+                utime._listeners.remove(self._apply_edges)
+            if self._next_edge_us in utime._deadline_hooks:
+                utime._deadline_hooks.remove(self._next_edge_us)
+        return self
+
+    @property
+    def i2c(self):
+        return machine.I2C.instances[-1] if machine.I2C.instances else None
+
+    @property
+    def panel(self):
+        bus = self.i2c
+        return bus.devices[self.config.I2C_ADDRESS] if bus else None
+
+    def pin(self, pin_id):
+        return machine.Pin.registry.get(pin_id)
+
+    def summary(self):
+        lines = [f"simulated {self.end_ms} ms in {self.wall_time_s * 1000:.1f} ms wall time"]
+        bus = self.i2c
+        if bus:
+            lines.append(f"I2C: {bus.transactions} transactions, {bus.bytes_written} bytes")
+        return "\n".join(lines)
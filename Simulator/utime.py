@@ -0,0 +1,142 @@
+# utime.py
+# Host stand-in for MicroPython's utime module, used to run the game code on a PC.
+# By default it follows the wall clock. After use_virtual_clock() time only moves when
+# sleep() or advance_us()/advance_ms() is called, which lets sequences run faster than real time
+# and makes timing fully repeatable.
+
+import time as _time
+
+# MicroPython tick counters wrap around at 2^30, the helpers below behave the same way.
+TICKS_PERIOD = 1 << 30
+_TICKS_MAX = TICKS_PERIOD - 1
+_TICKS_HALF = TICKS_PERIOD // 2
+
+class SimulationEnd(BaseException):
+    # Raised from sleep() once the virtual clock reaches the end set by stop_at_ms().
+    # It derives from BaseException so the game's own "except Exception" handlers don't catch it.
+    pass
+
+
+_start_ns = _time.monotonic_ns()
+_virtual_us = None  # None means the wall clock is used.
+_end_us = None  # Virtual time at which the simulation stops.
+_override_us = None  # When set, the clock reports this time (used to stamp injected pin edges).
+
+# Functions called with the current time in microseconds whenever the clock moves
+# (machine.Timer uses this to fire its callbacks).
+_listeners = []
+
+
+def use_virtual_clock(start_ms=0):
+    # Switches to a virtual clock that starts at start_ms and only advances on sleep().
+    global _virtual_us
+    _virtual_us = start_ms * 1000
+
+
+def use_wall_clock():
+    global _virtual_us
+    _virtual_us = None
+
+
+def stop_at_ms(end_ms):
+    # Makes the next sleep that reaches end_ms raise SimulationEnd (None disables it).
+    global _end_us
+    _end_us = None if end_ms is None else end_ms * 1000
+
+
+def is_virtual():
+    return _virtual_us is not None
+
+
+def _now_us():
+    if _override_us is not None:
+        return _override_us
+    if _virtual_us is not None:
+        return _virtual_us
+    return (_time.monotonic_ns() - _start_ns) // 1000
+
+
+def _notify():
+    now = _now_us()
+    for listener in list(_listeners):
+        listener(now)
+
+
+def advance_us(us):
+    # Moves the virtual clock forward, firing any timers that become due on the way.
+    global _virtual_us
+    if _virtual_us is None:
+        raise RuntimeError("advance_us() needs the virtual clock, call use_virtual_clock() first")
+    target = _virtual_us + int(us)
+    if _end_us is not None and target >= _end_us:
+        target = _end_us
+    # Step through timer deadlines one by one so periodic callbacks see the right time.
+    while True:
+        due = _next_deadline()
+        if due is None or due > target:
+            break
+        _virtual_us = max(_virtual_us, due)
+        _notify()
+    _virtual_us = target
+    _notify()
+    if _end_us is not None and _virtual_us >= _end_us:
+        raise SimulationEnd()
+
+
+def advance_ms(ms):
+    advance_us(ms * 1000)
+
+
+# Set by machine.Timer: returns the earliest pending timer deadline in microseconds, or None.
+_deadline_hooks = []
+
+
+def _next_deadline():
+    best = None
+    for hook in _deadline_hooks:
+        due = hook()
+        if due is not None and (best is None or due < best):
+            best = due
+    return best
+
+
+def ticks_us():
+    return _now_us() & _TICKS_MAX
+
+
+def ticks_ms():
+    return (_now_us() // 1000) & _TICKS_MAX
+
+
+def ticks_cpu():
+    return ticks_us()
+
+
+def ticks_add(ticks, delta):
+    return (ticks + delta) & _TICKS_MAX
+
+
+def ticks_diff(ticks1, ticks2):
+    return ((ticks1 - ticks2 + _TICKS_HALF) & _TICKS_MAX) - _TICKS_HALF
+
+
+def sleep_us(us):
+    if _virtual_us is not None:
+        advance_us(us)
+    else:
+        _time.sleep(us / 1000000)
+        _notify()
+        if _end_us is not None and _now_us() >= _end_us:
+            raise SimulationEnd()
+
+
+def sleep_ms(ms):
+    sleep_us(ms * 1000)
+
+
+def sleep(seconds):
+    sleep_us(seconds * 1000000)
+
+
+def time():
+    return _now_us() // 1000000